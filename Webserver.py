@@ -1,18 +1,47 @@
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, Response, abort, request, send_from_directory
 import subprocess
 import os
 import sys
 import signal
 import atexit
+import threading
 import struct
 import time
 import json
+import re
 import math
-from datetime import datetime
+import functools
+import gzip
+import hashlib
+from urllib.parse import urlsplit
 
 from hardware_interface_3_28 import get_sensor_data, get_shm_age_ms
 
+try:
+    import orjson   # optional C encoder; stdlib json is used when it is missing
+except ImportError:
+    orjson = None
+
+try:
+    from flask_compress import Compress   # optional gzip/br for JSON + HTML responses
+except ImportError:
+    Compress = None
+
+try:
+    import brotli   # optional; / is also served pre-compressed as br when it is present
+except ImportError:
+    brotli = None
+
+try:
+    from flask_sock import Sock   # optional WebSocket channel for joystick commands
+except ImportError:
+    Sock = None
+
 app = Flask(__name__)
+if Compress is not None:
+    app.config["COMPRESS_STREAMS"] = False   # gzip would buffer /sensor_stream events
+    Compress(app)
+sock = Sock(app) if Sock is not None else None
 
 PROGRAMS = {
     "sensors":    "sensors_3_28.py",
@@ -22,11 +51,14 @@ PROGRAMS = {
 }
 
 PROGRAM_PROCS = {name: None for name in PROGRAMS}
+# Start/stop of one program run one at a time: two quick clicks on the same button could
+# both see "not running" and launch two copies. Different programs don't block each other.
+_PROGRAM_LOCKS = {name: threading.RLock() for name in PROGRAMS}
 
 
 def _stop_all_on_exit():
     """Kill all managed subprocesses when the webapp exits (Ctrl+C, sys.exit, crash).
-    Without this, os.setsid() subprocesses survive the Flask process and run as
+    Without this, new-session subprocesses survive the Flask process and run as
     orphans — causing duplicate SHM writers, db lock conflicts, and calibration failures
     on the next webapp start."""
     for name in list(PROGRAMS.keys()):
@@ -40,10 +72,7 @@ def _stop_all_on_exit():
                 proc.terminate()
             proc.wait(timeout=3.0)
         except Exception:
-            try:
-                proc.kill()
-            except Exception:
-                pass
+            _kill_and_reap(proc)
         finally:
             PROGRAM_PROCS[name] = None
 
@@ -63,25 +92,87 @@ MOTOR_STATE_FILE      = os.path.join(_DIR, "motor_state.bin")
 SENSOR_STATS_FILE     = os.path.join(_DIR, "sensor_stats.bin")
 US_STATS_FILE         = os.path.join(_DIR, "us_stats.bin")
 PID_GAINS_FILE        = os.path.join(_DIR, "pid_gains.json")
+SENSOR_DATA_FILE      = os.path.join(_DIR, "sensor_data.txt")
 
 _pid_start_time = None
 
 
+PID_LOG_TAIL_BYTES = 16 * 1024   # ~100 rows of the PID log; doubled until enough are read
+PID_LOG_RESCAN_S   = 1.0         # how often to look for a newer robot_pid_new_log_*.txt
+
+# The newest PID log stays open across polls: the directory is globbed at most once a
+# second and the file is only reopened when a new run starts a new log.
+_pid_log_path = None
+_pid_log_fh = None
+_pid_log_scanned_at = float("-inf")   # monotonic time of the last glob
+_pid_log_lock = threading.Lock()   # the handle's seek position is shared
+
+
+def _pid_log_handle():
+    """Binary handle on the newest PID log, or None. Call with _pid_log_lock held."""
+    global _pid_log_path, _pid_log_fh, _pid_log_scanned_at
+    now = time.monotonic()
+    # Throttled whether or not a log is open — with PID stopped there usually is none
+    if now - _pid_log_scanned_at < PID_LOG_RESCAN_S:
+        return _pid_log_fh
+    _pid_log_scanned_at = now
+    import glob as _glob
+    # Newest run = lexically greatest name (what sorted(...)[-1] relied on); max() finds it
+    # in one pass instead of sorting every log ever written.
+    newest = max(_glob.iglob(os.path.join(_DIR, "robot_pid_new_log_*.txt")), default=None)
+    if newest != _pid_log_path or _pid_log_fh is None:
+        if _pid_log_fh is not None:
+            _pid_log_fh.close()
+        _pid_log_path, _pid_log_fh = newest, None
+        if newest is not None:
+            _pid_log_fh = open(newest, "rb")
+    return _pid_log_fh
+
+
+def _read_log_tail_lines(f, min_lines):
+    """Last lines of binary file f, reading backwards in growing blocks instead of the whole file."""
+    size = f.seek(0, os.SEEK_END)
+    block = PID_LOG_TAIL_BYTES
+    while True:
+        start = max(0, size - block)
+        f.seek(start)
+        lines = f.read(size - start).decode("utf-8", errors="replace").splitlines()
+        if start == 0:
+            return lines
+        lines = lines[1:]   # first line is cut by the seek
+        if len(lines) >= min_lines:
+            return lines
+        block *= 2
+
+
 def _read_pid_timing_stats():
     """Parse last 100 data rows from the most recent PID log file for dt_ms stats."""
+    global _pid_log_path, _pid_log_fh, _pid_log_scanned_at
     try:
-        import glob as _glob
-        logs = sorted(_glob.glob(os.path.join(_DIR, "robot_pid_new_log_*.txt")))
-        if not logs:
-            return None
-        with open(logs[-1], "r") as f:
-            lines = f.readlines()
+        with _pid_log_lock:
+            try:
+                f = _pid_log_handle()
+                if f is None:
+                    return None
+                # The log grows for as long as the PID runs; only its tail is ever needed
+                lines = _read_log_tail_lines(f, 101)
+            except OSError:
+                # Drop the handle and rescan on the next poll, which reopens from scratch
+                if _pid_log_fh is not None:
+                    try:
+                        _pid_log_fh.close()
+                    except OSError:
+                        pass
+                _pid_log_path, _pid_log_fh = None, None
+                _pid_log_scanned_at = float("-inf")
+                return None
         dt_vals = []
         for line in reversed(lines):
             line = line.strip()
             if not line or line.startswith("timestamp"):
                 continue
-            parts = line.split(",")
+            # Only dt_ms (column 9) is used: stop splitting there instead of splitting the row
+            parts = line.split(",", 10)
             if len(parts) >= 10:
                 try:
                     dt_vals.append(float(parts[9]))
@@ -103,26 +194,159 @@ def _read_pid_timing_stats():
 
 
 # Joystick throttling
-last_joystick_send = 0
+last_joystick_send = 0            # time.monotonic() of the last logged sample
 joystick_throttle_interval = 0.25  # seconds
+# Identical samples (to 0.01) inside this window share one motor_command.json write, even
+# when they come from different tabs. motor_wasd treats commands older than 300 ms as
+# stale, so the 150 ms UI heartbeat still lands.
+JOYSTICK_COALESCE_S = 0.1
+_joy_latest = (None, 0.0)   # ((x, y, speed) rounded, time of last motor_command.json write)
+_joy_lock = threading.Lock()   # request threads share the check, the write and the .tmp path
+
+
+# Log lines are buffered and appended to numbers.txt in one write per second (or sooner
+# once 64 KB is pending), so joystick bursts don't cost an open/write/close each.
+LOG_FILE              = os.path.join(_DIR, "numbers.txt")
+LOG_FLUSH_INTERVAL_S  = 1.0
+LOG_FLUSH_BYTES       = 64 * 1024
+
+_log_buf = []
+_log_buf_bytes = 0
+_log_buf_lock = threading.Lock()
+_log_write_lock = threading.Lock()   # keeps concurrent flushes in order
+_log_wake = threading.Event()        # set when the buffer fills; flusher writes early
+_log_fh = None                       # numbers.txt, kept open across flushes (under _log_write_lock)
+
+
+def _log_file():
+    """numbers.txt open for append; reopened if it was deleted or replaced since last use."""
+    global _log_fh
+    if _log_fh is not None:
+        try:
+            if os.stat(LOG_FILE).st_ino == os.fstat(_log_fh.fileno()).st_ino:
+                return _log_fh
+        except OSError:
+            pass
+        try:
+            _log_fh.close()
+        except OSError:
+            pass
+    _log_fh = open(LOG_FILE, "a")
+    return _log_fh
+
+
+def _fsync(fd):
+    """os.fsync, moved off the hub under gevent: there the flusher is a greenlet, and a
+    blocking fsync on the SD card would stall every connection for its duration."""
+    if _gevent_patched():
+        import gevent
+        gevent.get_hub().threadpool.apply(os.fsync, (fd,))
+    else:
+        os.fsync(fd)
+
+
+def _flush_log():
+    global _log_buf_bytes, _log_fh
+    with _log_write_lock:
+        with _log_buf_lock:
+            if not _log_buf:
+                return
+            chunk = "".join(_log_buf)
+            _log_buf.clear()
+            _log_buf_bytes = 0
+        try:
+            f = _log_file()
+            f.write(chunk)
+            f.flush()
+            _fsync(f.fileno())   # one fsync per batch, so a pulled battery loses ≤1 s
+        except Exception as e:
+            print(f"Error writing to numbers.txt: {e}")
+            try:
+                if _log_fh is not None:
+                    _log_fh.close()
+            except OSError:
+                pass
+            _log_fh = None   # start clean on the next flush
+
+
+def _log_flusher():
+    while True:
+        _log_wake.wait(LOG_FLUSH_INTERVAL_S)
+        _log_wake.clear()
+        _flush_log()
+
+
+threading.Thread(target=_log_flusher, name="log-flusher", daemon=True).start()
+atexit.register(_flush_log)
+
+
+_log_ts_prefix = (None, "")   # (epoch second, "YYYY-MM-DD HH:MM:SS") — strftime once a second
 
 
 def log_to_file(tag, message):
     """Log events to numbers.txt with timestamp"""
-    try:
-        with open(os.path.join(_DIR, "numbers.txt"), "a") as f:
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-            f.write(f"{timestamp} | {tag} | {message}\n")
-    except Exception as e:
-        print(f"Error writing to numbers.txt: {e}")
+    global _log_buf_bytes, _log_ts_prefix
+    ns = time.time_ns()
+    sec = ns // 1_000_000_000
+    if sec != _log_ts_prefix[0]:
+        _log_ts_prefix = (sec, time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(sec)))
+    line = f"{_log_ts_prefix[1]}.{ns // 1_000_000 % 1000:03d} | {tag} | {message}\n"
+    with _log_buf_lock:
+        _log_buf.append(line)
+        _log_buf_bytes += len(line)
+        full = _log_buf_bytes >= LOG_FLUSH_BYTES
+    if full:
+        _log_wake.set()   # disk I/O stays on the flusher thread, off the request path
 
 
 # ============================
 # GENERIC PROGRAM MANAGEMENT
 # ============================
+# Popen.poll() is a waitpid() syscall, and /sensor_data alone checks five programs
+# every 100 ms. Cache the result per handle. A child only stops running by exiting, which
+# raises SIGCHLD, so while our handler is installed a cached answer stays valid until the
+# next signal. The TTL only applies if something (e.g. gunicorn --preload) reset it, or
+# under gevent, where the handler is left to gevent's child watcher.
+_RUNNING_CACHE_TTL_S = 0.5
+_running_cache = {}   # name -> (proc, monotonic time of last poll, running, SIGCHLD generation)
+_sigchld_gen = 0      # bumped per SIGCHLD; entries polled under an older generation are stale
+
+
+def _invalidate_running_cache(*_):
+    global _sigchld_gen
+    _sigchld_gen += 1
+
+
+def _gevent_patched():
+    """True under gunicorn's gevent worker, whose hub reaps children via its own SIGCHLD watcher."""
+    monkey = sys.modules.get("gevent.monkey")
+    return monkey is not None and monkey.is_module_patched("os")
+
+
+if hasattr(signal, "SIGCHLD") and not _gevent_patched():
+    try:
+        signal.signal(signal.SIGCHLD, _invalidate_running_cache)
+    except ValueError:
+        pass   # not imported from the main thread — fall back to the TTL alone
+
+
+def _sigchld_hooked():
+    return hasattr(signal, "SIGCHLD") and signal.getsignal(signal.SIGCHLD) is _invalidate_running_cache
+
+
 def is_program_running(name):
     proc = PROGRAM_PROCS.get(name)
-    return proc is not None and proc.poll() is None
+    if proc is None:
+        return False
+    now = time.monotonic()
+    gen = _sigchld_gen   # read before poll(), so an exit racing the poll still invalidates
+    cached = _running_cache.get(name)
+    if (cached is not None and cached[0] is proc and cached[3] == gen
+            and (_sigchld_hooked() or now - cached[1] < _RUNNING_CACHE_TTL_S)):
+        return cached[2]
+    running = proc.poll() is None
+    _running_cache[name] = (proc, now, running, gen)
+    return running
 
 
 def _clear_dead_program_slot(name):
@@ -166,6 +390,14 @@ def _kill_orphans(script_name):
 
 
 def start_program(name):
+    lock = _PROGRAM_LOCKS.get(name)
+    if lock is None:
+        return _start_program(name)   # unknown name: reported there
+    with lock:
+        return _start_program(name)
+
+
+def _start_program(name):
     global LAST_PROGRAM_START_ERROR
     LAST_PROGRAM_START_ERROR = None
 
@@ -206,7 +438,9 @@ def start_program(name):
         stdout=subprocess.DEVNULL,
     )
     if os.name != "nt":
-        popen_kw["preexec_fn"] = os.setsid
+        # setsid() in the child from C, not a Python preexec_fn: no interpreter code runs
+        # between fork and exec, which is unsafe here with the request threads alive
+        popen_kw["start_new_session"] = True
     else:
         popen_kw["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP
 
@@ -261,8 +495,48 @@ def _start_failure_reason():
     return LAST_PROGRAM_START_ERROR
 
 
-# 8-byte double timestamp + 9 float32 — same as hardware_interface_3_28 / sensors_3_28
-_OBS_CACHE_MIN_BYTES = 8 + 9 * 4
+# Binary cache layouts, compiled once instead of re-resolving the format string per poll.
+# obs_cache.bin: 8-byte double timestamp + 9 float32 — same as hardware_interface_3_28 / sensors_3_28
+_OBS_CACHE_STRUCT    = struct.Struct("<d9f")
+_TS_TWO_FLOATS       = struct.Struct("<dff")         # ultrasonic_cache.bin, motor_state.bin
+_SENSOR_STATS_STRUCT = struct.Struct("<dffffdIII")   # sensor_stats.bin (44 bytes)
+_US_STATS_STRUCT     = struct.Struct("<dffffI")      # us_stats.bin (28 bytes)
+_OBS_CACHE_MIN_BYTES = _OBS_CACHE_STRUCT.size
+
+
+# The small binary caches are re-read on every /sensor_data tick. Keep one descriptor per
+# file and pread() it instead of open/read/close each time; the inode check picks up
+# writers that swap the file in with os.replace(). (POSIX only; see _read_bin_cache.)
+_bin_fds = {}   # path -> (fd, st_ino)
+_bin_fds_lock = threading.Lock()
+
+
+def _read_bin_cache(path, size):
+    """First size bytes of path through a cached descriptor; b"" if it can't be read."""
+    if not hasattr(os, "pread"):
+        # Windows: no pread, and a held descriptor would make the writers' os.replace()
+        # fail — open, read and close each time there
+        try:
+            with open(path, "rb") as f:
+                return f.read(size)
+        except OSError:
+            return b""
+    try:
+        ino = os.stat(path).st_ino
+    except OSError:
+        return b""
+    with _bin_fds_lock:
+        held = _bin_fds.get(path)
+        if held is None or held[1] != ino:
+            if held is not None:
+                os.close(held[0])
+                del _bin_fds[path]
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except OSError:
+                return b""
+            held = _bin_fds[path] = (fd, os.fstat(fd).st_ino)
+        return os.pread(held[0], size, 0)
 
 
 def _read_obs_cache_relaxed(target_velocity=0.0, target_rotation_rate=0.0, max_age_s=5.0):
@@ -271,14 +545,10 @@ def _read_obs_cache_relaxed(target_velocity=0.0, target_rotation_rate=0.0, max_a
     Used for /sensor_data when get_sensor_data() is None (scheduler jitter, web poll rate, etc.).
     """
     try:
-        if not os.path.isfile(OBS_CACHE_FILE):
-            return None
-        with open(OBS_CACHE_FILE, "rb") as f:
-            raw = f.read()
+        raw = _read_bin_cache(OBS_CACHE_FILE, _OBS_CACHE_STRUCT.size)
         if len(raw) < _OBS_CACHE_MIN_BYTES:
             return None
-        ts, = struct.unpack_from("<d", raw, 0)
-        obs = list(struct.unpack_from("<9f", raw, 8))
+        ts, *obs = _OBS_CACHE_STRUCT.unpack_from(raw, 0)
         age_s = time.monotonic() - ts
         if max_age_s is not None and age_s > float(max_age_s):
             return None
@@ -291,6 +561,30 @@ def _read_obs_cache_relaxed(target_velocity=0.0, target_rotation_rate=0.0, max_a
 
 
 def stop_program(name):
+    lock = _PROGRAM_LOCKS.get(name)
+    if lock is None:
+        return
+    with lock:
+        _stop_program(name)
+
+
+def _kill_and_reap(proc):
+    """SIGKILL the program's whole session and wait for the leader, so it doesn't linger
+    as a zombie after its slot is cleared."""
+    try:
+        if os.name != "nt":
+            os.killpg(proc.pid, signal.SIGKILL)   # started with start_new_session: pgid == pid
+        else:
+            proc.kill()
+    except Exception:
+        pass
+    try:
+        proc.wait(timeout=1.0)
+    except Exception:
+        pass
+
+
+def _stop_program(name):
     if not is_program_running(name):
         return
     try:
@@ -304,10 +598,7 @@ def stop_program(name):
         try:
             proc.wait(timeout=5.0)
         except Exception:
-            try:
-                proc.kill()
-            except Exception:
-                pass
+            _kill_and_reap(proc)
         log_to_file("SYSTEM", f"Program '{name}' stopped")
     except Exception as e:
         log_to_file("ERROR", f"Failed to stop program '{name}': {e}")
@@ -343,216 +634,397 @@ def stop_motor_test():
 # =======================
 # PARSE SENSOR LINE
 # =======================
+# /sensor_feed sections, in reply order. A section holds only the fields that carried a
+# value (see _SENSOR_LINE_FIELDS for the full set); readers treat a missing key as "".
+_SENSOR_FEED_SECTIONS = ("IMU1", "IMU1Linear", "EncoderL", "EncoderR", "Robot", "Pendulum", "Ultrasonic")
+
+
+# sensor_data.txt is one comma-separated line of sections in a fixed order, each optional:
+# a header token, optionally a value, then optional "label, value" pairs. Each row is
+# (header, value group or None, ((label, group), ...)); the regex below is compiled from it.
+_SENSOR_LINE_SECTIONS = (
+    ("IMU1", None, (
+        ("Forward/backwards",   "fwd"),
+        ("Side-to-Side",        "side"),
+        ("Yaw",                 "yaw"),
+        ("Pitch Rate",          "pitch_rate"),
+        ("Roll Rate",           "roll_rate"),
+        ("Rotational Velocity", "rot_vel"),
+    )),
+    ("IMU1 Linear Velocity",      "lin_vel",    ()),
+    ("IMU1's X-velocity",         "x_vel",      ()),
+    ("IMU1's Y-velocity",         "y_vel",      ()),
+    ("Robot Yaw Rate",            "yaw_rate",   ()),
+    ("Pendulum Angular Velocity", "pend_vel",   ()),
+    ("Pendulum Angle",            "pend_angle", ()),
+    ("Pendulum Angle (deg)",      "pend_deg",   ()),
+    ("EncoderL",                  "enc_l",      (("Direction", "enc_l_dir"),)),
+    ("EncoderR",                  "enc_r",      (("Direction", "enc_r_dir"),)),
+    ("Ultrasonic Right",          "us_right",   ()),
+    ("Ultrasonic Left",           "us_left",    ()),
+)
+
+
+def _compile_sensor_line_re(sections):
+    """One anchored pattern for the whole line. It is matched against "," + line, so every
+    token, the first included, is ",token"; each optional group mirrors one section."""
+    def tok(label):
+        return r",\s*" + re.escape(label) + r"\s*(?=,|$)"
+
+    def val(group):
+        return r",\s*(?P<" + group + r">[^,]*?)\s*(?=,|$)"
+
+    parts = [r"(?:,\s*(?P<time>[^,]*:[^,]*?)\s*(?=,|$))?"]
+    for header, group, pairs in sections:
+        tail = "".join(r"(?:" + tok(label) + val(g) + r")?" for label, g in pairs)
+        if group is not None:
+            tail = r"(?:" + val(group) + tail + r")?"
+        parts.append(r"(?:" + tok(header) + tail + r")?")
+    return re.compile("".join(parts))
+
+
+_SENSOR_LINE_RE = _compile_sensor_line_re(_SENSOR_LINE_SECTIONS)
+
+
+# regex group -> (section, key, how the raw token is stored)
+_SENSOR_LINE_FIELDS = (
+    ("time",       "IMU1",       "Time",                   "raw"),
+    ("fwd",        "IMU1",       "Forward/backwards Tilt", "num"),
+    ("side",       "IMU1",       "Side-to-Side Tilt",      "num"),
+    ("yaw",        "IMU1",       "Yaw",                    "num"),
+    ("pitch_rate", "IMU1",       "Pitch Rate",             "num"),
+    ("roll_rate",  "IMU1",       "Roll Rate",              "num"),
+    ("rot_vel",    "IMU1",       "Rotational Velocity",    "num"),
+    ("lin_vel",    "IMU1Linear", "Linear Velocity",        "num"),
+    ("x_vel",      "IMU1Linear", "X velocity",             "num"),
+    ("y_vel",      "IMU1Linear", "Y velocity",             "num"),
+    ("yaw_rate",   "Robot",      "Yaw Rate",               "num"),
+    ("pend_vel",   "Pendulum",   "Angular Velocity",       "num"),
+    ("pend_angle", "Pendulum",   "Angle",                  "num"),
+    ("pend_deg",   "Pendulum",   "AngleDeg",               "num"),
+    ("enc_l",      "EncoderL",   "Speed",                  "num"),
+    ("enc_l_dir",  "EncoderL",   "Direction",              "raw"),
+    ("enc_r",      "EncoderR",   "Speed",                  "num"),
+    ("enc_r_dir",  "EncoderR",   "Direction",              "raw"),
+    ("us_right",   "Ultrasonic", "Right",                  "cm"),
+    ("us_left",    "Ultrasonic", "Left",                   "cm"),
+)
+# Hoisted once: the group names to pull in one match.group() call, and where each value goes
+_SENSOR_LINE_GROUPS  = tuple(f[0] for f in _SENSOR_LINE_FIELDS)
+_SENSOR_LINE_TARGETS = tuple(f[1:] for f in _SENSOR_LINE_FIELDS)
+
+
+def _num2sig(x):
+    """Two significant figures for numeric tokens; anything else is passed through."""
+    try:
+        v = float(x)
+    except Exception:
+        return x
+    return f"{v:.2g}"
+
+
+@functools.lru_cache(maxsize=32)
 def parse_sensor_line(line):
-    result = {
+    """Parse one sensor_data.txt line. Memoized — callers must not mutate the result."""
+    result = {k: {} for k in _SENSOR_FEED_SECTIONS}
+    try:
+        values = _SENSOR_LINE_RE.match("," + line).group(*_SENSOR_LINE_GROUPS)
+        for (section, key, kind), v in zip(_SENSOR_LINE_TARGETS, values):
+            if not v:
+                continue
+            if kind == "cm":
+                v = _num2sig(v.replace("cm", "").strip())
+            elif kind == "num":
+                v = _num2sig(v)
+            if v != "":
+                result[section][key] = v
+    except Exception as e:
+        log_to_file("ERROR", f"parse_sensor_line error: {e}")
+
+    return result
+
+
+def _sensor_feed_from_obs(obs):
+    """Fill the /sensor_feed layout from the SHM observation vector (see sensor_data()).
+    Ultrasonic comes from ultrasonic_cache.bin. The text-only fields (IMU1 Time, Side-to-Side
+    Tilt and Roll Rate, IMU1Linear X/Y velocity, Encoder Direction) have no source here."""
+    vel, pitch, pitch_rate, yaw_rate, wl, wr, _, _, yaw = map(float, obs[:9])
+    us_right, us_left, _ = _read_ultrasonic()
+    ultrasonic = {}
+    if us_right is not None:
+        ultrasonic["Right"] = _num2sig(us_right)
+    if us_left is not None:
+        ultrasonic["Left"] = _num2sig(us_left)
+    # Pitch, pitch rate and yaw rate each fill two fields; format each value once
+    pitch_deg  = _num2sig(math.degrees(pitch))
+    pitch_rate = _num2sig(pitch_rate)
+    yaw_rate   = _num2sig(yaw_rate)
+    return {
         "IMU1": {
-            "Time": "",
-            "Forward/backwards Tilt": "",
-            "Side-to-Side Tilt": "",
-            "Yaw": "",
-            "Pitch Rate": "",
-            "Roll Rate": "",
-            "Rotational Velocity": "",
-        },
-        "IMU1Linear": {
-            "Linear Velocity": "",
-            "X velocity": "",
-            "Y velocity": "",
-        },
-        "EncoderL": {
-            "Speed": "",
-            "Direction": "",
-        },
-        "EncoderR": {
-            "Speed": "",
-            "Direction": "",
-        },
-        "Robot": {
-            "Yaw Rate": "",
+            "Forward/backwards Tilt": pitch_deg,
+            "Yaw":                    _num2sig(math.degrees(yaw)),
+            "Pitch Rate":             pitch_rate,
+            "Rotational Velocity":    yaw_rate,
         },
+        "IMU1Linear": {"Linear Velocity": _num2sig(vel)},
+        "EncoderL":   {"Speed": _num2sig(wl)},
+        "EncoderR":   {"Speed": _num2sig(wr)},
+        "Robot":      {"Yaw Rate": yaw_rate},
         "Pendulum": {
-            "Angular Velocity": "",
-            "Angle": "",
-            "AngleDeg": "",
-        },
-        "Ultrasonic": {
-            "Right": "",
-            "Left": "",
+            "Angular Velocity": pitch_rate,
+            "Angle":            _num2sig(pitch),
+            "AngleDeg":         pitch_deg,
         },
+        "Ultrasonic": ultrasonic,
     }
 
-    def num2sig(x):
-        try:
-            v = float(x)
-        except Exception:
-            return x
-        return f"{v:.2g}"
 
-    try:
-        tokens = [tok.strip() for tok in line.split(",")]
-        idx = 0
-
-        if idx < len(tokens) and ":" in tokens[idx]:
-            result["IMU1"]["Time"] = tokens[idx]
-            idx += 1
-
-        if idx < len(tokens) and tokens[idx] == "IMU1":
-            idx += 1
-            imu1_map = [
-                ("Forward/backwards", "Forward/backwards Tilt"),
-                ("Side-to-Side", "Side-to-Side Tilt"),
-                ("Yaw", "Yaw"),
-                ("Pitch Rate", "Pitch Rate"),
-                ("Roll Rate", "Roll Rate"),
-                ("Rotational Velocity", "Rotational Velocity"),
-            ]
-            for label, key in imu1_map:
-                if idx + 1 < len(tokens) and tokens[idx] == label:
-                    result["IMU1"][key] = num2sig(tokens[idx + 1])
-                    idx += 2
-
-        if idx < len(tokens) and tokens[idx] == "IMU1 Linear Velocity":
-            idx += 1
-            if idx < len(tokens):
-                result["IMU1Linear"]["Linear Velocity"] = num2sig(tokens[idx])
-                idx += 1
-
-        if idx < len(tokens) and tokens[idx] == "IMU1's X-velocity":
-            idx += 1
-            if idx < len(tokens):
-                result["IMU1Linear"]["X velocity"] = num2sig(tokens[idx])
-                idx += 1
-
-        if idx < len(tokens) and tokens[idx] == "IMU1's Y-velocity":
-            idx += 1
-            if idx < len(tokens):
-                result["IMU1Linear"]["Y velocity"] = num2sig(tokens[idx])
-                idx += 1
-
-        if idx < len(tokens) and tokens[idx] == "Robot Yaw Rate":
-            idx += 1
-            if idx < len(tokens):
-                result["Robot"]["Yaw Rate"] = num2sig(tokens[idx])
-                idx += 1
-
-        if idx < len(tokens) and tokens[idx] == "Pendulum Angular Velocity":
-            idx += 1
-            if idx < len(tokens):
-                result["Pendulum"]["Angular Velocity"] = num2sig(tokens[idx])
-                idx += 1
-
-        if idx < len(tokens) and tokens[idx] == "Pendulum Angle":
-            idx += 1
-            if idx < len(tokens):
-                result["Pendulum"]["Angle"] = num2sig(tokens[idx])
-                idx += 1
-
-        if idx < len(tokens) and tokens[idx] == "Pendulum Angle (deg)":
-            idx += 1
-            if idx < len(tokens):
-                result["Pendulum"]["AngleDeg"] = num2sig(tokens[idx])
-                idx += 1
-
-        if idx < len(tokens) and tokens[idx] == "EncoderL":
-            idx += 1
-            if idx < len(tokens):
-                result["EncoderL"]["Speed"] = num2sig(tokens[idx])
-                idx += 1
-            if idx < len(tokens) and tokens[idx] == "Direction":
-                idx += 1
-                if idx < len(tokens):
-                    result["EncoderL"]["Direction"] = tokens[idx]
-                    idx += 1
-
-        if idx < len(tokens) and tokens[idx] == "EncoderR":
-            idx += 1
-            if idx < len(tokens):
-                result["EncoderR"]["Speed"] = num2sig(tokens[idx])
-                idx += 1
-            if idx < len(tokens) and tokens[idx] == "Direction":
-                idx += 1
-                if idx < len(tokens):
-                    result["EncoderR"]["Direction"] = tokens[idx]
-                    idx += 1
-
-        if idx < len(tokens) and tokens[idx] == "Ultrasonic Right":
-            idx += 1
-            if idx < len(tokens):
-                val_num = tokens[idx].replace("cm", "").strip()
-                result["Ultrasonic"]["Right"] = num2sig(val_num)
-                idx += 1
-
-        if idx < len(tokens) and tokens[idx] == "Ultrasonic Left":
-            idx += 1
-            if idx < len(tokens):
-                val_num = tokens[idx].replace("cm", "").strip()
-                result["Ultrasonic"]["Left"] = num2sig(val_num)
-                idx += 1
+def _dumps_json(obj):
+    """Encode obj to JSON bytes, via orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
 
-    except Exception as e:
-        log_to_file("ERROR", f"parse_sensor_line error: {e}")
 
-    return result
+def _loads_json(s):
+    """Decode JSON text or bytes, via orjson when it is installed (errors are ValueError)."""
+    if orjson is not None:
+        return orjson.loads(s)
+    return json.loads(s)
+
+
+# Constant reply bodies, encoded once. Each request still gets its own Response object —
+# Flask and flask-compress mutate responses, so a shared instance isn't safe to return.
+_BODY_OFF              = _dumps_json({"status": "OFF"})
+_BODY_OK               = _dumps_json({"status": "ok"})
+_BODY_STARTED          = _dumps_json({"status": "started"})
+_BODY_FAILED           = _dumps_json({"status": "failed"})
+_BODY_STOPPED          = _dumps_json({"status": "stopped"})
+_BODY_STOPPED_RUNNING  = _dumps_json({"status": "stopped", "running": False})
+_BODY_SUITE_STOPPED    = _dumps_json({"status": "stopped", "sensors_running": False,
+                                      "ultrasonic_running": False})
+_BODY_NUMBER_FEED      = _dumps_json({"value": 42})
+_BODY_TOP_ROW          = _dumps_json({"message": "Removed top row!"})
+_BODY_JOY_UNLOGGED     = _dumps_json({"message": ""})   # /direction_ajax between log lines
+
+
+def _json_body(body):
+    return Response(body, mimetype="application/json")
+
+
+def _json_response(obj):
+    """JSON reply for obj; every route answers through this (or _json_body for fixed bodies)."""
+    return _json_body(_dumps_json(obj))
+
+
+_sensor_line_cache = (None, "")   # (stat signature, first line) of sensor_data.txt
+
+
+def _read_sensor_line():
+    """First line of sensor_data.txt; re-read only when the file's stat signature changes."""
+    global _sensor_line_cache
+    try:
+        st = os.stat(SENSOR_DATA_FILE)
+    except OSError:
+        return ""
+    sig = (st.st_ino, st.st_mtime_ns, st.st_size)
+    if sig != _sensor_line_cache[0]:
+        try:
+            with open(SENSOR_DATA_FILE, "r") as f:
+                line = f.readline().strip()
+        except Exception:
+            line = ""
+        _sensor_line_cache = (sig, line)
+    return _sensor_line_cache[1]
 
 
 # ==============
 # FLASK ROUTES
 # ==============
+# (raw line, encoded body, etag) of the last /sensor_feed reply — repeated lines skip parse + encode
+_sensor_feed_last = (None, b"", "")
+
+# Reply for a missing or empty sensor_data.txt, encoded once. Kept apart from
+# _sensor_feed_last so a momentarily empty file (writer mid-rewrite) doesn't evict it.
+_EMPTY_SENSOR_FEED_BODY = _dumps_json({k: {} for k in _SENSOR_FEED_SECTIONS})
+_EMPTY_SENSOR_FEED = (_EMPTY_SENSOR_FEED_BODY, hashlib.md5(_EMPTY_SENSOR_FEED_BODY).hexdigest())
+
+
+# Tabs polling at once within this window share one built body instead of each reading
+# SHM / sensor_data.txt again, so the source is hit at most ~10×/s whatever the client count.
+SENSOR_FEED_TTL_S = 0.1
+_sensor_feed_ttl = (0.0, None, None)   # (monotonic build time, body, etag)
+_sensor_feed_lock = threading.Lock()   # single-flight rebuild when the window expires
+
+
+def _build_sensor_feed():
+    """(body, etag) for /sensor_feed from the freshest source available."""
+    global _sensor_feed_last
+    # Prefer the calibrated SHM frame: no file I/O and no text parsing on the hot path.
+    obs = None
+    if is_program_running("sensors") and get_shm_age_ms() is not None:
+        obs = get_sensor_data()
+    if obs is not None and len(obs) >= 9:
+        body = _dumps_json(_sensor_feed_from_obs(obs))
+        return body, hashlib.md5(body).hexdigest()
+    line = _read_sensor_line()
+    if not line:
+        return _EMPTY_SENSOR_FEED
+    if line != _sensor_feed_last[0]:
+        etag = hashlib.md5(line.encode("utf-8")).hexdigest()
+        _sensor_feed_last = (line, _dumps_json(parse_sensor_line(line)), etag)
+    return _sensor_feed_last[1], _sensor_feed_last[2]
+
+
 @app.route("/sensor_feed")
 def sensor_feed():
-    try:
-        with open(os.path.join(_DIR, "sensor_data.txt"), "r") as f:
-            line = f.readline().strip()
-            return jsonify(parse_sensor_line(line))
-    except Exception:
-        return jsonify(parse_sensor_line(""))
+    global _sensor_feed_ttl
+    built_at, body, etag = _sensor_feed_ttl
+    if body is None or time.monotonic() - built_at >= SENSOR_FEED_TTL_S:
+        with _sensor_feed_lock:
+            built_at, body, etag = _sensor_feed_ttl   # re-check: a waiting thread may find it fresh
+            now = time.monotonic()
+            if body is None or now - built_at >= SENSOR_FEED_TTL_S:
+                body, etag = _build_sensor_feed()
+                _sensor_feed_ttl = (now, body, etag)   # one tuple swap; readers never lock
+    # Unchanged frame → 304 with no body; fetch() revalidates via If-None-Match on its own.
+    # The common idle case answers straight from the header without building a full reply.
+    if request.if_none_match.contains(etag):
+        resp = Response(status=304)
+    else:
+        resp = Response(body, mimetype="application/json")
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
 
 
 @app.route("/sensor_on", methods=["POST"])
 def sensor_on():
     ok = start_imu()
-    return jsonify({"status": "ON" if ok else "ERROR"})
+    return _json_response({"status": "ON" if ok else "ERROR"})
 
 
 @app.route("/sensor_off", methods=["POST"])
 def sensor_off():
     stop_imu()
-    return jsonify({"status": "OFF"})
+    return _json_body(_BODY_OFF)
 
 
 @app.route("/get_number_feed")
 def get_number_feed():
-    return jsonify({"value": 42})
+    resp = _json_body(_BODY_NUMBER_FEED)
+    resp.headers["Cache-Control"] = "max-age=3600"
+    return resp
 
 
-@app.route("/direction_ajax", methods=["POST"])
-def direction_ajax():
-    global last_joystick_send
-    current_time = time.time()
-    data = request.get_json()
+def _apply_joystick(data):
+    """Log (throttled) and forward one joystick sample to motor_command.json.
+    Shared by POST /direction_ajax and the /ws channel."""
+    global last_joystick_send, _joy_latest
+    now = time.monotonic()
     x = float(data.get("x", 0.0))
     y = float(data.get("y", 0.0))
-    msg = f"Joystick x={x:.2f}, y={y:.2f}"
-    if current_time - last_joystick_send >= joystick_throttle_interval:
-        last_joystick_send = current_time
+    # Throttle check first — the message is only formatted when it will be logged
+    msg = ""
+    with _joy_lock:
+        log_now = now - last_joystick_send >= joystick_throttle_interval
+        if log_now:
+            last_joystick_send = now
+    if log_now:
+        msg = f"Joystick x={x:.2f}, y={y:.2f}"
         log_to_file("JOYSTICK", msg)
     # Write to motor_command.json so motorwasd picks it up when running
     try:
         speed = float(data.get("speed", 0.5))
-        cmd = {"fwd": y, "turn": x, "speed": speed, "ts": time.monotonic()}
-        tmp = MOTOR_CMD_FILE + ".tmp"
-        with open(tmp, "w") as f:
-            json.dump(cmd, f)
-        os.replace(tmp, MOTOR_CMD_FILE)
+        key = (round(x, 2), round(y, 2), round(speed, 2))
+        with _joy_lock:
+            if key == _joy_latest[0] and now - _joy_latest[1] < JOYSTICK_COALESCE_S:
+                return msg
+            _joy_latest = (key, now)
+            cmd = {"fwd": y, "turn": x, "speed": speed, "ts": now}
+            tmp = MOTOR_CMD_FILE + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(_dumps_json(cmd))
+            os.replace(tmp, MOTOR_CMD_FILE)
     except Exception:
         pass
-    return jsonify({"message": msg})
+    return msg
+
+
+# The 150 ms heartbeat re-posts the same body while the knob is held: reuse the dict parsed
+# from it last time. It is still applied every time, so the command file stays fresh.
+_joy_last_body = (None, None)   # (raw request body, parsed dict) — the dict is read-only
+
+
+@app.route("/direction_ajax", methods=["POST"])
+def direction_ajax():
+    global _joy_last_body
+    # JSON only: a cross-origin page can POST text/plain without a CORS preflight, and
+    # must not be able to drive the motors. Bad bodies stop here too.
+    if request.mimetype != "application/json":
+        abort(415)
+    raw = request.get_data(cache=False)
+    last_raw, data = _joy_last_body
+    if raw != last_raw:
+        try:
+            data = _loads_json(raw)
+        except ValueError:
+            data = None
+        if not isinstance(data, dict):
+            abort(400)
+        _joy_last_body = (raw, data)
+    msg = _apply_joystick(data)
+    return _json_response({"message": msg}) if msg else _json_body(_BODY_JOY_UNLOGGED)
+
+
+if sock is not None:
+    @sock.route("/ws")
+    def control_socket(ws):
+        """One long-lived connection for joystick samples — no HTTP round-trip per move.
+        A client that sends {"type": "sub", "topic": "sensor"} also gets the /sensor_data
+        payload pushed back on the same socket: the whole dict first, then only the keys
+        whose values changed (keys that went away are sent as null)."""
+        # CORS doesn't cover WebSockets: without this any page the operator has open could
+        # connect and send joystick frames. Browsers always send Origin; other clients
+        # (scripts on the robot) usually don't and are let through.
+        origin = request.headers.get("Origin")
+        if origin is not None and urlsplit(origin).netloc != request.host:
+            ws.close(reason=1008, message="cross-origin")   # 1008: policy violation
+            return
+        subscribed, last, last_body, next_push = False, {}, None, 0.0
+        while True:
+            raw = ws.receive(timeout=SENSOR_STREAM_INTERVAL_S if subscribed else None)
+            if raw is not None:
+                try:
+                    msg = _loads_json(raw)
+                    kind = msg.get("type")
+                    if kind == "joy":
+                        _apply_joystick(msg)
+                    elif kind == "sub":
+                        subscribed, last, last_body = msg.get("topic") == "sensor", {}, None
+                except (ValueError, TypeError, AttributeError):
+                    pass
+            if subscribed:
+                now = time.monotonic()
+                if now >= next_push:
+                    next_push = now + SENSOR_STREAM_INTERVAL_S
+                    data, body, _ = _sensor_data_snapshot()
+                    # Same encoded snapshot as last push (cache hit or unchanged rebuild):
+                    # nothing to diff and nothing to send
+                    if body == last_body:
+                        continue
+                    last_body = body
+                    delta = {k: v for k, v in data.items() if k not in last or last[k] != v}
+                    delta.update(dict.fromkeys(last.keys() - data.keys()))
+                    if delta:
+                        last = data
+                        ws.send(_dumps_json(delta).decode("utf-8"))
 
 
 @app.route("/get_top_row", methods=["POST"])
 def get_top_row():
     log_to_file("ACTION", "Remove Row pressed")
-    return jsonify({"message": "Removed top row!"})
+    return _json_body(_BODY_TOP_ROW)
 
 
 @app.route("/start_pigpiod", methods=["POST"])
@@ -564,49 +1036,80 @@ def start_pigpiod_route():
         )
         if result.returncode == 0 or "already running" in result.stderr.lower():
             log_to_file("SYSTEM", "pigpiod started")
-            return jsonify({"status": "started"})
+            return _json_response({"status": "started"})
         else:
             msg = result.stderr.strip() or result.stdout.strip() or "unknown error"
             log_to_file("ERROR", f"pigpiod failed: {msg}")
-            return jsonify({"status": "failed", "reason": msg})
+            return _json_response({"status": "failed", "reason": msg})
     except Exception as e:
         log_to_file("ERROR", f"pigpiod exception: {e}")
-        return jsonify({"status": "failed", "reason": str(e)})
+        return _json_response({"status": "failed", "reason": str(e)})
 
 
 @app.route("/start_motor_test", methods=["POST"])
 def start_motor_test_route():
     ok = start_motor_test()
-    return jsonify({"status": "started" if ok else "failed"})
+    return _json_body(_BODY_STARTED if ok else _BODY_FAILED)
 
 
 @app.route("/stop_motor_test", methods=["POST"])
 def stop_motor_test_route():
     stop_motor_test()
-    return jsonify({"status": "stopped"})
+    return _json_body(_BODY_STOPPED)
 
 
-@app.route("/start_autonav", methods=["POST"])
-def start_autonav_route():
-    ok = start_program("autonav")
-    return jsonify({
-        "status": "started" if ok else "failed",
-        "reason": None if ok else _start_failure_reason(),
-    })
+# Programs whose start/stop need no interlocks (unlike sensors, pid, motorwasd)
+# share one view instead of a route pair each.
+_SIMPLE_PROGRAMS = ("ultrasonic", "autonav")
 
 
-@app.route("/stop_autonav", methods=["POST"])
-def stop_autonav_route():
-    stop_program("autonav")
-    return jsonify({"status": "stopped"})
+@app.route("/program/<action>/<name>", methods=["POST"])
+def program_control_route(action, name):
+    if name not in _SIMPLE_PROGRAMS:
+        abort(404)
+    if action == "start":
+        ok = start_program(name)
+        return _json_response({
+            "status": "started" if ok else "failed",
+            "running": is_program_running(name),
+            "reason": None if ok else _start_failure_reason(),
+        })
+    if action == "stop":
+        stop_program(name)
+        return _json_body(_BODY_STOPPED_RUNNING)
+    abort(404)
+
+
+# Pre-dispatch URLs (/start_ultrasonic, /stop_autonav, ...) kept for one release so
+# dashboards loaded from an older server keep working.
+for _action in ("start", "stop"):
+    for _name in _SIMPLE_PROGRAMS:
+        app.add_url_rule(
+            f"/{_action}_{_name}", endpoint=f"{_action}_{_name}_compat", methods=["POST"],
+            view_func=functools.partial(program_control_route, _action, _name),
+        )
 
 
 # ==================================
 # SENSOR PIPELINE ROUTES
 # ==================================
 
-@app.route("/sensor_data")
-def sensor_data():
+def _read_ultrasonic():
+    """ultrasonic_cache.bin (16 bytes: float64 ts + 2 × float32) → (right_cm, left_cm, age_ms).
+    A negative distance means no echo and comes back as None; all three are None if unreadable."""
+    try:
+        raw = _read_bin_cache(ULTRASONIC_CACHE_FILE, _TS_TWO_FLOATS.size)
+        if len(raw) >= _TS_TWO_FLOATS.size:
+            us_ts, right, left = _TS_TWO_FLOATS.unpack_from(raw, 0)
+            return (float(right) if right >= 0 else None,
+                    float(left)  if left  >= 0 else None,
+                    (time.monotonic() - us_ts) * 1000.0)
+    except Exception:
+        pass
+    return None, None, None
+
+
+def _build_sensor_data():
     """
     Observation vector via hardware_interface_3_28.get_sensor_data (SHM → cache → DB).
     Ultrasonic distances still read from ultrasonic_cache.bin (not in obs vector).
@@ -659,39 +1162,32 @@ def sensor_data():
                 result["obs_source"] = "cache_relaxed"
 
     if obs is not None and len(obs) >= 9:
-        result["linear_velocity"]  = round(float(obs[0]), 4)
-        result["pitch_deg"]        = round(math.degrees(float(obs[1])), 3)
-        result["pitch_rate"]       = round(float(obs[2]), 4)
-        result["yaw_rate"]         = round(float(obs[3]), 4)
-        result["wheel_left_rads"]  = round(float(obs[4]), 4)
-        result["wheel_right_rads"] = round(float(obs[5]), 4)
-        result["velocity_error"]   = round(float(obs[6]), 4)
-        result["rotation_error"]   = round(float(obs[7]), 4)
-        result["yaw_deg"]          = round(math.degrees(float(obs[8])), 3)
+        # Unpack the obs vector once (it may be a numpy array, where each index is a boxing call)
+        vel, pitch, pitch_rate, yaw_rate, wl, wr, vel_err, rot_err, yaw = map(float, obs[:9])
+        result["linear_velocity"]  = round(vel, 4)
+        result["pitch_deg"]        = round(math.degrees(pitch), 3)
+        result["pitch_rate"]       = round(pitch_rate, 4)
+        result["yaw_rate"]         = round(yaw_rate, 4)
+        result["wheel_left_rads"]  = round(wl, 4)
+        result["wheel_right_rads"] = round(wr, 4)
+        result["velocity_error"]   = round(vel_err, 4)
+        result["rotation_error"]   = round(rot_err, 4)
+        result["yaw_deg"]          = round(math.degrees(yaw), 3)
 
     if shm_age is not None:
         result["cache_age_ms"] = round(shm_age, 2)
 
-    # --- ultrasonic_cache.bin (16 bytes: float64 ts + 2 × float32) ---
-    try:
-        with open(ULTRASONIC_CACHE_FILE, "rb") as f:
-            raw = f.read()
-        if len(raw) >= 16:
-            us_ts,      = struct.unpack_from("<d",  raw, 0)
-            right, left  = struct.unpack_from("<ff", raw, 8)
-            us_age_ms = (time.monotonic() - us_ts) * 1000.0
-            result["ultrasonic_right_cm"] = round(float(right), 1) if right >= 0 else None
-            result["ultrasonic_left_cm"]  = round(float(left),  1) if left  >= 0 else None
-            result["us_age_ms"]           = round(us_age_ms, 2)
-    except Exception:
-        pass
+    us_right, us_left, us_age_ms = _read_ultrasonic()
+    if us_age_ms is not None:
+        result["ultrasonic_right_cm"] = round(us_right, 1) if us_right is not None else None
+        result["ultrasonic_left_cm"]  = round(us_left,  1) if us_left  is not None else None
+        result["us_age_ms"]           = round(us_age_ms, 2)
 
     # --- motor_state.bin (float64 ts + 2 × float32) ---
     try:
-        with open(MOTOR_STATE_FILE, "rb") as f:
-            raw = f.read()
-        if len(raw) >= 16:
-            ms_ts, ml, mr = struct.unpack_from("<dff", raw, 0)
+        raw = _read_bin_cache(MOTOR_STATE_FILE, _TS_TWO_FLOATS.size)
+        if len(raw) >= _TS_TWO_FLOATS.size:
+            ms_ts, ml, mr = _TS_TWO_FLOATS.unpack_from(raw, 0)
             if time.monotonic() - ms_ts < 0.5:
                 result["motor_left"]  = round(float(ml), 4)
                 result["motor_right"] = round(float(mr), 4)
@@ -700,11 +1196,10 @@ def sensor_data():
 
     # --- sensor_stats.bin ---
     try:
-        with open(SENSOR_STATS_FILE, "rb") as f:
-            raw = f.read()
-        if len(raw) >= 44:
-            ts, main_hz, imu_hz, enc_hz, pass_rate, _ = struct.unpack_from("<dffffd", raw, 0)
-            succ, fail, total = struct.unpack_from("<III", raw, 32)
+        raw = _read_bin_cache(SENSOR_STATS_FILE, _SENSOR_STATS_STRUCT.size)
+        if len(raw) >= _SENSOR_STATS_STRUCT.size:
+            ts, main_hz, imu_hz, enc_hz, pass_rate, _, succ, fail, total = \
+                _SENSOR_STATS_STRUCT.unpack_from(raw, 0)
             age_s = time.monotonic() - ts
             if age_s < 5.0:
                 result["sensor_stats"] = {
@@ -722,11 +1217,9 @@ def sensor_data():
 
     # --- us_stats.bin ---
     try:
-        with open(US_STATS_FILE, "rb") as f:
-            raw = f.read()
-        if len(raw) >= 28:
-            ts, loop_hz, r_pct, l_pct, _ = struct.unpack_from("<dffff", raw, 0)
-            cyc, = struct.unpack_from("<I", raw, 24)
+        raw = _read_bin_cache(US_STATS_FILE, _US_STATS_STRUCT.size)
+        if len(raw) >= _US_STATS_STRUCT.size:
+            ts, loop_hz, r_pct, l_pct, _, cyc = _US_STATS_STRUCT.unpack_from(raw, 0)
             age_s = time.monotonic() - ts
             if age_s < 5.0:
                 result["us_stats"] = {
@@ -746,21 +1239,151 @@ def sensor_data():
     # --- PID loop timing stats ---
     result["pid_timing"] = _read_pid_timing_stats() if is_program_running("pid") else None
 
-    return jsonify(result)
+    return result
+
+
+# /sensor_data pollers, every /sensor_stream generator and every /ws subscriber ask for
+# the same snapshot. Within this window they share one build (SHM read, five cache files,
+# PID log tail) instead of each doing it. Half the 100 ms UI cadence keeps frames fresh.
+SENSOR_DATA_TTL_S = 0.05
+# The snapshot is encoded once per build too, so pollers and SSE streams send the same bytes.
+_sensor_data_cache = (0.0, None, b"")   # (monotonic build time, dict, JSON body); dict is read-only
+_sensor_data_lock = threading.Lock()   # one rebuild per expiry; other threads wait for it
+
+
+def _sensor_data_snapshot(flush=False):
+    """(dict, JSON body, monotonic build time) of the current /sensor_data payload.
+    flush=True rebuilds even inside the TTL window; the fresh result replaces the cache."""
+    global _sensor_data_cache
+    built_at, data, body = _sensor_data_cache
+    if not flush and data is not None and time.monotonic() - built_at < SENSOR_DATA_TTL_S:
+        return data, body, built_at
+    with _sensor_data_lock:
+        # Another thread may have rebuilt it while this one waited for the lock
+        built_at, data, body = _sensor_data_cache
+        now = time.monotonic()
+        if flush or data is None or now - built_at >= SENSOR_DATA_TTL_S:
+            data = _build_sensor_data()
+            body = _dumps_json(data)
+            built_at = now
+            _sensor_data_cache = (now, data, body)
+    return data, body, built_at
+
+
+@app.route("/sensor_data")
+def sensor_data():
+    """Latest snapshot; ?flush=1 skips the TTL cache (e.g. right after a start/stop click)."""
+    _, body, built_at = _sensor_data_snapshot(flush=request.args.get("flush") == "1")
+    resp = _json_body(body)
+    # Not in the body: a per-build field would make every SSE frame differ from the last
+    resp.headers["X-Snapshot-Age-Ms"] = f"{(time.monotonic() - built_at) * 1000:.1f}"
+    return resp
+
+
+# /sensor_feed_bin frame: little-endian float32 per field, in this order (NaN = missing).
+SENSOR_FEED_BIN_FIELDS = (
+    "linear_velocity", "pitch_deg", "pitch_rate", "yaw_rate",
+    "wheel_left_rads", "wheel_right_rads", "yaw_deg",
+    "ultrasonic_right_cm", "ultrasonic_left_cm",
+)
+_SENSOR_FEED_BIN = struct.Struct("<" + "f" * len(SENSOR_FEED_BIN_FIELDS))
+
+
+@app.route("/sensor_feed_bin")
+def sensor_feed_bin():
+    """Live SHM values as one packed frame (read with a Float32Array); 204 until calibrated."""
+    obs = None
+    if is_program_running("sensors") and get_shm_age_ms() is not None:
+        obs = get_sensor_data()
+    if obs is None or len(obs) < 9:
+        return Response(status=204)
+    us_right, us_left, _ = _read_ultrasonic()
+    nan = float("nan")
+    vel, pitch, pitch_rate, yaw_rate, wl, wr, _, _, yaw = map(float, obs[:9])
+    body = _SENSOR_FEED_BIN.pack(
+        vel, math.degrees(pitch), pitch_rate, yaw_rate, wl, wr, math.degrees(yaw),
+        nan if us_right is None else us_right,
+        nan if us_left  is None else us_left,
+    )
+    return Response(body, mimetype="application/octet-stream")
+
+
+SENSOR_STREAM_INTERVAL_S  = 0.1    # same cadence the dashboard used to poll at
+SENSOR_STREAM_KEEPALIVE_S = 15.0   # comment frame so dead clients are noticed while idle
+
+
+# /sensor_stream fan-out: while any stream is open, one publisher thread checks the
+# snapshot each interval and wakes the streams only when its encoded body changes, so
+# N open tabs cost one check per tick instead of N.
+_sensor_pub_cond = threading.Condition()
+_sensor_pub = (0, None)      # (sequence number, body); body None until the publisher's first check
+_sensor_pub_subs = 0         # open /sensor_stream generators
+_sensor_pub_thread = None
+
+
+def _sensor_publisher():
+    global _sensor_pub, _sensor_pub_thread
+    while True:
+        try:
+            body = _sensor_data_snapshot()[1]
+        except Exception:
+            body = _sensor_pub[1]
+        with _sensor_pub_cond:
+            if _sensor_pub_subs == 0:
+                # Nobody listening: stop, and don't let a later first subscriber see a stale body
+                _sensor_pub, _sensor_pub_thread = (_sensor_pub[0] + 1, None), None
+                return
+            if body is not None and body != _sensor_pub[1]:
+                _sensor_pub = (_sensor_pub[0] + 1, body)
+                _sensor_pub_cond.notify_all()
+        time.sleep(SENSOR_STREAM_INTERVAL_S)
+
+
+@app.route("/sensor_stream")
+def sensor_stream():
+    """Server-Sent Events feed of the /sensor_data payload, pushed only when it changes."""
+    def frames():
+        global _sensor_pub_subs, _sensor_pub_thread
+        with _sensor_pub_cond:
+            _sensor_pub_subs += 1
+            if _sensor_pub_thread is None:
+                _sensor_pub_thread = threading.Thread(target=_sensor_publisher, daemon=True)
+                _sensor_pub_thread.start()
+        seen = 0
+        try:
+            while True:
+                with _sensor_pub_cond:
+                    _sensor_pub_cond.wait_for(
+                        lambda: _sensor_pub[0] != seen and _sensor_pub[1] is not None,
+                        timeout=SENSOR_STREAM_KEEPALIVE_S)
+                    seq, body = _sensor_pub
+                if seq != seen and body is not None:
+                    seen = seq
+                    yield b"data: " + body + b"\n\n"
+                else:
+                    yield b": keepalive\n\n"
+        finally:
+            with _sensor_pub_cond:
+                _sensor_pub_subs -= 1
+
+    resp = Response(frames(), mimetype="text/event-stream")
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.headers["X-Accel-Buffering"] = "no"
+    return resp
 
 
 @app.route("/start_sensor_suite", methods=["POST"])
 def start_sensor_suite_route():
     if is_program_running("sensors") and is_program_running("ultrasonic"):
-        return jsonify({"status": "already_running", "sensors_running": True, "ultrasonic_running": True})
+        return _json_response({"status": "already_running", "sensors_running": True, "ultrasonic_running": True})
     ok_sensors = start_program("sensors")
     if not ok_sensors:
-        return jsonify({
+        return _json_response({
             "status": "failed", "reason": _start_failure_reason(),
             "sensors_running": False, "ultrasonic_running": False,
         })
     ok_ultrasonic = start_program("ultrasonic")
-    return jsonify({
+    return _json_response({
         "status": "started",
         "sensors_running": is_program_running("sensors"),
         "ultrasonic_running": is_program_running("ultrasonic"),
@@ -772,15 +1395,15 @@ def start_sensor_suite_route():
 def stop_sensor_suite_route():
     stop_program("sensors")
     stop_program("ultrasonic")
-    return jsonify({"status": "stopped", "sensors_running": False, "ultrasonic_running": False})
+    return _json_body(_BODY_SUITE_STOPPED)
 
 
 @app.route("/start_sensors", methods=["POST"])
 def start_sensors_route():
     if is_program_running("sensors"):
-        return jsonify({"status": "already_running", "running": True, "reason": None})
+        return _json_response({"status": "already_running", "running": True, "reason": None})
     ok = start_program("sensors")
-    return jsonify({
+    return _json_response({
         "status": "started" if ok else "failed",
         "running": is_program_running("sensors"),
         "reason": None if ok else _start_failure_reason(),
@@ -790,35 +1413,19 @@ def start_sensors_route():
 @app.route("/stop_sensors", methods=["POST"])
 def stop_sensors_route():
     stop_program("sensors")
-    return jsonify({"status": "stopped", "running": False})
-
-
-@app.route("/start_ultrasonic", methods=["POST"])
-def start_ultrasonic_route():
-    ok = start_program("ultrasonic")
-    return jsonify({
-        "status": "started" if ok else "failed",
-        "running": is_program_running("ultrasonic"),
-        "reason": None if ok else _start_failure_reason(),
-    })
-
-
-@app.route("/stop_ultrasonic", methods=["POST"])
-def stop_ultrasonic_route():
-    stop_program("ultrasonic")
-    return jsonify({"status": "stopped", "running": False})
+    return _json_body(_BODY_STOPPED_RUNNING)
 
 
 @app.route("/start_pid", methods=["POST"])
 def start_pid_route():
     global _pid_start_time
     if is_program_running("motorwasd"):
-        return jsonify({"status": "blocked", "reason": "Stop manual motor control first",
-                        "running": False})
+        return _json_response({"status": "blocked", "reason": "Stop manual motor control first",
+                              "running": False})
     ok = start_program("pid")
     if ok:
         _pid_start_time = time.monotonic()
-    return jsonify({
+    return _json_response({
         "status": "started" if ok else "failed",
         "running": is_program_running("pid"),
         "reason": None if ok else _start_failure_reason(),
@@ -829,14 +1436,14 @@ def start_pid_route():
 def reset_motor_state_route():
     """Write a zeroed motor_state.bin so the UI shows 0 after a manual reset."""
     try:
-        buf = struct.pack("<dff", 0.0, 0.0, 0.0)   # ts=0 → will be treated as stale by poller
+        buf = _TS_TWO_FLOATS.pack(0.0, 0.0, 0.0)   # ts=0 → will be treated as stale by poller
         tmp = MOTOR_STATE_FILE + ".tmp"
         with open(tmp, "wb") as f:
             f.write(buf)
         os.replace(tmp, MOTOR_STATE_FILE)
     except Exception:
         pass
-    return jsonify({"status": "ok"})
+    return _json_body(_BODY_OK)
 
 
 @app.route("/stop_pid", methods=["POST"])
@@ -850,7 +1457,7 @@ def stop_pid_route():
         set_motor_velocities(0.0, 0.0)
     except Exception:
         pass
-    return jsonify({"status": "stopped", "running": False})
+    return _json_body(_BODY_STOPPED_RUNNING)
 
 
 @app.route("/get_pid_gains", methods=["GET"])
@@ -858,13 +1465,13 @@ def get_pid_gains_route():
     try:
         with open(PID_GAINS_FILE, "r") as f:
             gains = json.load(f)
-        return jsonify({"status": "ok", "gains": gains})
+        return _json_response({"status": "ok", "gains": gains})
     except FileNotFoundError:
-        return jsonify({"status": "defaults", "gains": {
+        return _json_response({"status": "defaults", "gains": {
             "kp": 60.0, "kd": 12.0, "ki": 0.0, "trim_deg": 0.0, "tip_deg": 35.0
         }})
     except Exception as e:
-        return jsonify({"status": "error", "reason": str(e)})
+        return _json_response({"status": "error", "reason": str(e)})
 
 
 @app.route("/set_pid_gains", methods=["POST"])
@@ -883,9 +1490,9 @@ def set_pid_gains_route():
             json.dump(gains, f)
         os.replace(tmp, PID_GAINS_FILE)
         log_to_file("PID", f"Gains updated: {gains}")
-        return jsonify({"status": "ok", "gains": gains})
+        return _json_response({"status": "ok", "gains": gains})
     except Exception as e:
-        return jsonify({"status": "error", "reason": str(e)})
+        return _json_response({"status": "error", "reason": str(e)})
 
 
 # ==================================
@@ -895,11 +1502,11 @@ def set_pid_gains_route():
 @app.route("/motor_on", methods=["POST"])
 def motor_on_route():
     if is_program_running("pid"):
-        return jsonify({"status": "blocked", "reason": "Stop PID first",
-                        "running": False})
+        return _json_response({"status": "blocked", "reason": "Stop PID first",
+                              "running": False})
     _write_motor_cmd(0.0, 0.0, 0.5)
     ok = start_program("motorwasd")
-    return jsonify({
+    return _json_response({
         "status": "started" if ok else "failed",
         "running": is_program_running("motorwasd"),
         "reason": None if ok else _start_failure_reason(),
@@ -910,25 +1517,34 @@ def motor_on_route():
 def motor_off_route():
     _write_motor_cmd(0.0, 0.0, 0.0)
     stop_program("motorwasd")
-    return jsonify({"status": "stopped", "running": False})
+    return _json_body(_BODY_STOPPED_RUNNING)
 
 
 @app.route("/motor_cmd", methods=["POST"])
 def motor_cmd_route():
-    data  = request.get_json(silent=True) or {}
+    # The WASD heartbeat (every 150 ms while a key is held): decode with orjson like
+    # /direction_ajax. Anything that isn't a JSON object counts as {} — stop.
+    data = None
+    if request.mimetype == "application/json":
+        try:
+            data = _loads_json(request.get_data(cache=False))
+        except ValueError:
+            pass
+    if not isinstance(data, dict):
+        data = {}
     fwd   = float(data.get("fwd",   0.0))
     turn  = float(data.get("turn",  0.0))
     speed = float(data.get("speed", 0.5))
     _write_motor_cmd(fwd, turn, speed)
-    return jsonify({"fwd": fwd, "turn": turn, "speed": speed})
+    return _json_response({"fwd": fwd, "turn": turn, "speed": speed})
 
 
 def _write_motor_cmd(fwd: float, turn: float, speed: float):
     cmd = {"fwd": fwd, "turn": turn, "speed": speed, "ts": time.monotonic()}
     try:
         tmp = MOTOR_CMD_FILE + ".tmp"
-        with open(tmp, "w") as f:
-            json.dump(cmd, f)
+        with open(tmp, "wb") as f:
+            f.write(_dumps_json(cmd))
         os.replace(tmp, MOTOR_CMD_FILE)
     except Exception as e:
         log_to_file("ERROR", f"motor_cmd write failed: {e}")
@@ -990,10 +1606,7 @@ def serve_graph1():
 def serve_graph2():
     return send_from_directory(_DIR, "graph2.jpg")
 
-@app.route("/")
-def home():
-    log_to_file("SYSTEM", "Web interface loaded")
-    return """
+_HOME_HTML = """
 <!DOCTYPE html>
 <html>
 <head>
@@ -1232,6 +1845,7 @@ def home():
             border-radius: 50%;
             background: radial-gradient(circle at 30% 30%, #3cf0ff, #0e4f5b);
             box-shadow: 0 0 14px #29f0ffaa;
+            will-change: transform;
         }
 
         .joy-readouts { display: flex; gap: 8px; font-family: ui-monospace; font-size: 12px; }
@@ -1756,163 +2370,225 @@ def home():
     let _calibStartTime = null;          // monotonic timestamp when calibration started
     const _CALIB_DURATION_S = 10;        // countdown length (matches sensor flush + calibrate)
 
-    function updateLiveSensorData() {
-        fetch('/sensor_data?t=' + Date.now(), { cache: 'no-store' }).then(r => r.json()).then(d => {
-            function fmt(v, dec) {
-                return (v === null || v === undefined) ? (0).toFixed(dec) : parseFloat(v).toFixed(dec);
-            }
-            const sensOff      = !d.sensors_running;
-            const sensNotReady = !d.sensors_running || !d.calibrated;  // off OR still calibrating
-            const usOff        = !d.ultrasonic_running;
-
-            // Feed pitch + RPM charts — skip stale or pre-calibration samples
-            const cacheStale = d.cache_age_ms === null || d.cache_age_ms === undefined || d.cache_age_ms > 200;
-            if (!sensOff && d.calibrated && !cacheStale) {
-                if (d.pitch_deg !== null && d.pitch_deg !== undefined)
-                    pushPitchSample(parseFloat(d.pitch_deg));
-                if (d.wheel_left_rads !== null && d.wheel_right_rads !== null &&
-                    d.wheel_left_rads !== undefined && d.wheel_right_rads !== undefined)
-                    pushRpmSample(parseFloat(d.wheel_left_rads), parseFloat(d.wheel_right_rads));
-            }
-            document.getElementById('obs-linvel').textContent    = sensNotReady ? '0.000' : fmt(d.linear_velocity, 3);
-            document.getElementById('obs-pitch').textContent     = sensNotReady ? '0.00'  : fmt(d.pitch_deg, 2);
-            drawPitchGauge(sensNotReady ? 0 : (d.pitch_deg || 0));
-            document.getElementById('obs-pitchrate').textContent = sensNotReady ? '0.000' : fmt(d.pitch_rate, 3);
-            document.getElementById('obs-yawrate').textContent   = sensNotReady ? '0.000' : fmt(d.yaw_rate, 3);
-            document.getElementById('obs-whl').textContent       = sensNotReady ? '0.000' : fmt(d.wheel_left_rads, 3);
-            document.getElementById('obs-whr').textContent       = sensNotReady ? '0.000' : fmt(d.wheel_right_rads, 3);
-            document.getElementById('obs-yaw').textContent       = sensNotReady ? '0.00'  : fmt(d.yaw_deg, 2);
-            document.getElementById('obs-us-r').textContent      = usOff   ? '0.0'   : (d.ultrasonic_right_cm !== null ? fmt(d.ultrasonic_right_cm, 1) : '0.0');
-            document.getElementById('obs-us-l').textContent      = usOff   ? '0.0'   : (d.ultrasonic_left_cm  !== null ? fmt(d.ultrasonic_left_cm,  1) : '0.0');
-
-            // PID loop timing
-            const pt = d.pid_timing;
-            document.getElementById('pid-hz').textContent        = pt ? pt.hz + ' Hz'                   : '0 Hz';
-            document.getElementById('pid-avg-ms').textContent    = pt ? pt.avg_ms                        : '0';
-            document.getElementById('pid-minmax-ms').textContent = pt ? pt.min_ms + ' / ' + pt.max_ms   : '0 / 0';
-
-            // Sensor pipeline stats — all zero when sensors are off or still calibrating
-            const cacheAge = (!sensNotReady && d.cache_age_ms !== null && d.cache_age_ms !== undefined) ? d.cache_age_ms : null;
-            const cacheAgeEl = document.getElementById('sp-cache-age');
-            if (cacheAge !== null) {
-                cacheAgeEl.textContent = cacheAge.toFixed(1);
-                cacheAgeEl.style.color = cacheAge < 15 ? '#8dff8a' : cacheAge < 35 ? '#ffdd57' : '#ff5555';
-            } else {
-                cacheAgeEl.textContent = '0'; cacheAgeEl.style.color = '';
-            }
-            const srcMap = { 'hardware_interface': 'SHM', 'cache_relaxed': 'File', null: '0' };
-            document.getElementById('sp-source').textContent = sensNotReady ? '0' : (srcMap[d.obs_source] || d.obs_source || '0');
-            const ss = (!sensNotReady) ? d.sensor_stats : null;
-            if (ss) {
-                document.getElementById('sp-main-hz').textContent  = ss.main_hz;
-                document.getElementById('sp-imu-hz').textContent   = ss.imu_hz;
-                document.getElementById('sp-enc-hz').textContent   = ss.enc_hz.toLocaleString();
-                const prEl = document.getElementById('sp-pass-rate');
-                prEl.textContent  = ss.pass_rate.toFixed(1) + '%';
-                prEl.style.color  = ss.pass_rate >= 99 ? '#8dff8a' : ss.pass_rate >= 95 ? '#ffdd57' : '#ff5555';
-                document.getElementById('sp-reads').textContent = ss.successful.toLocaleString() + ' / ' + ss.total.toLocaleString();
-            } else {
-                ['sp-main-hz','sp-imu-hz','sp-enc-hz','sp-reads'].forEach(id => {
-                    const el = document.getElementById(id); if (el) { el.textContent = '0'; el.style.color = ''; }
-                });
-                const prFb = document.getElementById('sp-pass-rate');
-                if (prFb) { prFb.textContent = '0%'; prFb.style.color = ''; }
-            }
+    // Observation readouts: [element id, /sensor_data key, decimals]. Elements are
+    // resolved once here, so each tick indexes an array instead of searching the DOM.
+    const OBS_READOUTS = [
+        ['obs-linvel',    'linear_velocity',  3],
+        ['obs-pitch',     'pitch_deg',        2],
+        ['obs-pitchrate', 'pitch_rate',       3],
+        ['obs-yawrate',   'yaw_rate',         3],
+        ['obs-whl',       'wheel_left_rads',  3],
+        ['obs-whr',       'wheel_right_rads', 3],
+        ['obs-yaw',       'yaw_deg',          2],
+    ];
+    const OBS_READOUT_ELS = OBS_READOUTS.map(f => document.getElementById(f[0]));
+    const OBS_READOUT_ZERO = OBS_READOUTS.map(f => (0).toFixed(f[2]));
+
+    // The other per-tick readouts, also resolved once (missing ones stay null)
+    const LIVE_EL = {};
+    ['obs-us-r', 'obs-us-l', 'pid-hz', 'pid-avg-ms', 'pid-minmax-ms', 'sp-cache-age', 'sp-source',
+     'sp-main-hz', 'sp-imu-hz', 'sp-enc-hz', 'sp-pass-rate', 'sp-reads', 'us-loop-hz', 'imu-time',
+     'obs-age-line', 'calib-bar'].forEach(id => { LIVE_EL[id] = document.getElementById(id); });
+
+    // toLocaleTimeString() builds a new Intl formatter per call; keep two and, for the live
+    // clock, only reformat when the second changes (it is read every frame).
+    const _localTimeFmt = new Intl.DateTimeFormat(undefined, { hour: 'numeric', minute: 'numeric', second: 'numeric' });
+    const _gbTimeFmt    = new Intl.DateTimeFormat('en-GB', { hour: 'numeric', minute: 'numeric', second: 'numeric', hour12: false });
+    let _clockSec = -1, _clockStr = '';
+    function clockText() {
+        const now = Date.now(), sec = Math.floor(now / 1000);
+        if (sec !== _clockSec) { _clockSec = sec; _clockStr = _localTimeFmt.format(now); }
+        return _clockStr;
+    }
 
-            // Ultrasonic loop Hz
-            const usHz = document.getElementById('us-loop-hz');
-            if (usHz) usHz.textContent = (d.us_stats ? d.us_stats.loop_hz : '0');
+    // Only touch the DOM when the text actually changes — most ticks repeat the last value
+    function setText(el, v) {
+        v = String(v);
+        if (el && el.textContent !== v) el.textContent = v;
+    }
 
-            // Stability timer + best run tracker
-            updateStabilityTimer(d.pid_running, d.pid_elapsed_s);
+    function _applyLiveSensorData(d) {
+        function fmt(v, dec) {
+            return (v === null || v === undefined) ? (0).toFixed(dec) : parseFloat(v).toFixed(dec);
+        }
+        const sensOff      = !d.sensors_running;
+        const sensNotReady = !d.sensors_running || !d.calibrated;  // off OR still calibrating
+        const usOff        = !d.ultrasonic_running;
+
+        // Feed pitch + RPM charts — skip stale or pre-calibration samples
+        const cacheStale = d.cache_age_ms === null || d.cache_age_ms === undefined || d.cache_age_ms > 200;
+        if (!sensOff && d.calibrated && !cacheStale) {
+            if (d.pitch_deg !== null && d.pitch_deg !== undefined)
+                pushPitchSample(parseFloat(d.pitch_deg));
+            if (d.wheel_left_rads !== null && d.wheel_right_rads !== null &&
+                d.wheel_left_rads !== undefined && d.wheel_right_rads !== undefined)
+                pushRpmSample(parseFloat(d.wheel_left_rads), parseFloat(d.wheel_right_rads));
+        }
+        for (let i = 0; i < OBS_READOUTS.length; i++) {
+            const f = OBS_READOUTS[i];
+            setText(OBS_READOUT_ELS[i], sensNotReady ? OBS_READOUT_ZERO[i] : fmt(d[f[1]], f[2]));
+        }
+        drawPitchGauge(sensNotReady ? 0 : (d.pitch_deg || 0));
+        setText(LIVE_EL['obs-us-r'], usOff ? '0.0' : (d.ultrasonic_right_cm !== null ? fmt(d.ultrasonic_right_cm, 1) : '0.0'));
+        setText(LIVE_EL['obs-us-l'], usOff ? '0.0' : (d.ultrasonic_left_cm  !== null ? fmt(d.ultrasonic_left_cm,  1) : '0.0'));
+
+        // PID loop timing
+        const pt = d.pid_timing;
+        setText(LIVE_EL['pid-hz'],        pt ? pt.hz + ' Hz'                 : '0 Hz');
+        setText(LIVE_EL['pid-avg-ms'],    pt ? pt.avg_ms                      : '0');
+        setText(LIVE_EL['pid-minmax-ms'], pt ? pt.min_ms + ' / ' + pt.max_ms : '0 / 0');
+
+        // Sensor pipeline stats — all zero when sensors are off or still calibrating
+        const cacheAge = (!sensNotReady && d.cache_age_ms !== null && d.cache_age_ms !== undefined) ? d.cache_age_ms : null;
+        const cacheAgeEl = LIVE_EL['sp-cache-age'];
+        if (cacheAge !== null) {
+            setText(cacheAgeEl, cacheAge.toFixed(1));
+            cacheAgeEl.style.color = cacheAge < 15 ? '#8dff8a' : cacheAge < 35 ? '#ffdd57' : '#ff5555';
+        } else {
+            setText(cacheAgeEl, '0'); cacheAgeEl.style.color = '';
+        }
+        const srcMap = { 'hardware_interface': 'SHM', 'cache_relaxed': 'File', null: '0' };
+        setText(LIVE_EL['sp-source'], sensNotReady ? '0' : (srcMap[d.obs_source] || d.obs_source || '0'));
+        const ss = (!sensNotReady) ? d.sensor_stats : null;
+        if (ss) {
+            setText(LIVE_EL['sp-main-hz'], ss.main_hz);
+            setText(LIVE_EL['sp-imu-hz'],  ss.imu_hz);
+            setText(LIVE_EL['sp-enc-hz'],  ss.enc_hz.toLocaleString());
+            const prEl = LIVE_EL['sp-pass-rate'];
+            setText(prEl, ss.pass_rate.toFixed(1) + '%');
+            prEl.style.color  = ss.pass_rate >= 99 ? '#8dff8a' : ss.pass_rate >= 95 ? '#ffdd57' : '#ff5555';
+            setText(LIVE_EL['sp-reads'], ss.successful.toLocaleString() + ' / ' + ss.total.toLocaleString());
+        } else {
+            ['sp-main-hz','sp-imu-hz','sp-enc-hz','sp-reads'].forEach(id => {
+                const el = LIVE_EL[id]; if (el) { setText(el, '0'); el.style.color = ''; }
+            });
+            const prFb = LIVE_EL['sp-pass-rate'];
+            if (prFb) { setText(prFb, '0%'); prFb.style.color = ''; }
+        }
 
-            // Update timestamp in Live Sensor Data title
-            document.getElementById('imu-time').textContent = new Date().toLocaleTimeString();
+        // Ultrasonic loop Hz
+        setText(LIVE_EL['us-loop-hz'], d.us_stats ? d.us_stats.loop_hz : '0');
 
-            // Motor command indicator bars + stress + current (skip if reset lock is active)
-            if (Date.now() > _motorResetUntil) {
-                updateMotorBar('motor-left',  d.motor_left);
-                updateMotorBar('motor-right', d.motor_right);
-                updateMotorStress(d.motor_left, d.motor_right);
-                updateCurrentDraw(d.motor_left, d.motor_right);
-            }
+        // Stability timer + best run tracker
+        updateStabilityTimer(d.pid_running, d.pid_elapsed_s);
 
-            // Odometry
-            updateOdometry(d.wheel_left_rads, d.wheel_right_rads, d.sensors_running && d.calibrated);
+        // Update timestamp in Live Sensor Data title
+        setText(LIVE_EL['imu-time'], clockText());
 
-            const ageLine  = document.getElementById('obs-age-line');
-            const calibBar = document.getElementById('calib-bar');
-            function setCalibBars(color, text) {
-                calibBar.style.color = color; calibBar.textContent = text;
-            }
+        // Motor command indicator bars + stress + current (skip if reset lock is active)
+        if (Date.now() > _motorResetUntil) {
+            updateMotorBar('motor-left',  d.motor_left);
+            updateMotorBar('motor-right', d.motor_right);
+            updateMotorStress(d.motor_left, d.motor_right);
+            updateCurrentDraw(d.motor_left, d.motor_right);
+        }
 
-            const hasObs = d.sensors_running && d.calibrated && d.linear_velocity !== null && d.linear_velocity !== undefined;
-            const ageOk = d.cache_age_ms !== null && d.cache_age_ms !== undefined;
+        // Odometry
+        updateOdometry(d.wheel_left_rads, d.wheel_right_rads, d.sensors_running && d.calibrated);
 
-            if (hasObs) {
-                if (!_sensorsWereRunning && d.sensors_running) {
-                    _sensorsWereRunning = true;
-                    _calibStartTime = null;
-                    logLine('SENSORS', 'Data flowing — calibration complete');
-                }
-                const src = d.obs_source === 'cache_relaxed' ? ' (file)' : '';
-                setCalibBars('var(--ok)', 'Live — calibrated' + src);
-                setLed('led-sensors-panel', true);
-                const ageStale = ageOk && d.cache_age_ms > 200;
-                ageLine.className = ageStale ? 'obs-age stale' : 'obs-age';
-                ageLine.style.color = '';
-                let line = '';
-                if (ageOk && d.sensors_running && d.cache_age_ms < 1000) {
-                    line = 'SHM age: ' + d.cache_age_ms.toFixed(1) + ' ms';
-                } else {
-                    line = 'Live data';
-                }
-                if (d.us_age_ms !== null && d.us_age_ms !== undefined) {
-                    line += '  |  US age: ' + d.us_age_ms.toFixed(0) + ' ms';
-                }
-                ageLine.textContent = line;
-            } else if (!d.sensors_running) {
-                setCalibBars('#aaa', 'Sensors not running — press ON');
-                setLed('led-sensors-panel', false);
-                ageLine.className = 'obs-age';
-                ageLine.style.color = '';
-                ageLine.textContent = '';
-                _sensorsWereRunning = false;
+        const ageLine  = LIVE_EL['obs-age-line'];
+        const calibBar = LIVE_EL['calib-bar'];
+        function setCalibBars(color, text) {
+            calibBar.style.color = color; setText(calibBar, text);
+        }
+
+        const hasObs = d.sensors_running && d.calibrated && d.linear_velocity !== null && d.linear_velocity !== undefined;
+        const ageOk = d.cache_age_ms !== null && d.cache_age_ms !== undefined;
+
+        if (hasObs) {
+            if (!_sensorsWereRunning && d.sensors_running) {
+                _sensorsWereRunning = true;
                 _calibStartTime = null;
-            } else {
-                // Sensors running but not calibrated yet — show countdown
-                if (_calibStartTime === null) _calibStartTime = Date.now();
-                const elapsed = (Date.now() - _calibStartTime) / 1000;
-                const remaining = Math.max(0, Math.ceil(_CALIB_DURATION_S - elapsed));
-                setCalibBars('#ffdd57', 'Sensors Calibrating — keep robot still... ' + remaining + 's');
-                const el = document.getElementById('led-sensors-panel');
-                if (el) { el.className = 'led warn'; }
-                ageLine.className = 'obs-age';
-                ageLine.style.color = '#ffdd57';
-                ageLine.textContent = 'Warmup — waiting for obs_cache / SHM…';
+                logLine('SENSORS', 'Data flowing — calibration complete');
             }
-
-            // Update LEDs
-            setLed('led-sensors',         d.sensors_running);
-            setLed('led-ultrasonic',      d.ultrasonic_running);
-            setLed('led-pid',             d.pid_running);
-            setLed('led-motorwasd',       d.motorwasd_running);
-            setLed('led-motorwasd-panel', d.motorwasd_running);
-
-
-            // WASD panel status text
-            const wasdTxt = document.getElementById('wasd-status-txt');
-            if (d.motorwasd_running) {
-                wasdTxt.style.color = '#8dff8a';
-                wasdTxt.textContent = 'Motors LIVE — use keys or buttons';
-            } else if (d.pid_running) {
-                wasdTxt.style.color = '#ffdd57';
-                wasdTxt.textContent = 'PID running — stop PID to use manual control';
+            const src = d.obs_source === 'cache_relaxed' ? ' (file)' : '';
+            setCalibBars('var(--ok)', 'Live — calibrated' + src);
+            setLed('led-sensors-panel', true);
+            const ageStale = ageOk && d.cache_age_ms > 200;
+            ageLine.className = ageStale ? 'obs-age stale' : 'obs-age';
+            ageLine.style.color = '';
+            let line = '';
+            if (ageOk && d.sensors_running && d.cache_age_ms < 1000) {
+                line = 'SHM age: ' + d.cache_age_ms.toFixed(1) + ' ms';
             } else {
-                wasdTxt.style.color = '#aaa';
-                wasdTxt.textContent = 'Motors OFF — press ON above to start';
+                line = 'Live data';
             }
-        }).catch(() => {});
+            if (d.us_age_ms !== null && d.us_age_ms !== undefined) {
+                line += '  |  US age: ' + d.us_age_ms.toFixed(0) + ' ms';
+            }
+            ageLine.textContent = line;
+        } else if (!d.sensors_running) {
+            setCalibBars('#aaa', 'Sensors not running — press ON');
+            setLed('led-sensors-panel', false);
+            ageLine.className = 'obs-age';
+            ageLine.style.color = '';
+            ageLine.textContent = '';
+            _sensorsWereRunning = false;
+            _calibStartTime = null;
+        } else {
+            // Sensors running but not calibrated yet — show countdown
+            if (_calibStartTime === null) _calibStartTime = Date.now();
+            const elapsed = (Date.now() - _calibStartTime) / 1000;
+            const remaining = Math.max(0, Math.ceil(_CALIB_DURATION_S - elapsed));
+            setCalibBars('#ffdd57', 'Sensors Calibrating — keep robot still... ' + remaining + 's');
+            const el = document.getElementById('led-sensors-panel');
+            if (el) { el.className = 'led warn'; }
+            ageLine.className = 'obs-age';
+            ageLine.style.color = '#ffdd57';
+            ageLine.textContent = 'Warmup — waiting for obs_cache / SHM…';
+        }
+
+        // Update LEDs
+        setLed('led-sensors',         d.sensors_running);
+        setLed('led-ultrasonic',      d.ultrasonic_running);
+        setLed('led-pid',             d.pid_running);
+        setLed('led-motorwasd',       d.motorwasd_running);
+        setLed('led-motorwasd-panel', d.motorwasd_running);
+
+
+        // WASD panel status text
+        const wasdTxt = document.getElementById('wasd-status-txt');
+        if (d.motorwasd_running) {
+            wasdTxt.style.color = '#8dff8a';
+            wasdTxt.textContent = 'Motors LIVE — use keys or buttons';
+        } else if (d.pid_running) {
+            wasdTxt.style.color = '#ffdd57';
+            wasdTxt.textContent = 'PID running — stop PID to use manual control';
+        } else {
+            wasdTxt.style.color = '#aaa';
+            wasdTxt.textContent = 'Motors OFF — press ON above to start';
+        }
+    }
+
+    // DOM writes happen in one requestAnimationFrame pass. If several frames arrive
+    // between paints (SSE burst, poll catch-up) only the newest is rendered.
+    let _pendingLiveData = null;
+    function _queueLiveSensorData(d) {
+        if (_pendingLiveData === null) {
+            requestAnimationFrame(() => {
+                const latest = _pendingLiveData;
+                _pendingLiveData = null;
+                _applyLiveSensorData(latest);
+            });
+        }
+        _pendingLiveData = d;
+    }
+
+    // At most one poll in flight: ticks that land while a request is pending are skipped,
+    // and a request stuck for over a second is aborted, so a stalled link can't pile up.
+    const SENSOR_POLL_STUCK_MS = 1000;
+    let _sensorPoll = null;   // { ctrl: AbortController, startedAt: ms }
+
+    function updateLiveSensorData() {
+        if (_sensorStreamOpen) return;   // frames are arriving over /sensor_stream
+        if (_sensorPoll) {
+            if (Date.now() - _sensorPoll.startedAt < SENSOR_POLL_STUCK_MS) return;
+            _sensorPoll.ctrl.abort();
+        }
+        const poll = _sensorPoll = { ctrl: new AbortController(), startedAt: Date.now() };
+        fetch('/sensor_data?t=' + Date.now(), { cache: 'no-store', signal: poll.ctrl.signal })
+            .then(r => r.json()).then(_queueLiveSensorData).catch(() => {})
+            .finally(() => { if (_sensorPoll === poll) _sensorPoll = null; });
     }
 
     function setLed(id, on) {
@@ -2645,8 +3321,27 @@ def home():
         setLed('led-ultrasonic', !!d.ultrasonic_running);
         updateStabilityTimer(d.pid_running, d.pid_elapsed_s);
 
-        document.getElementById('imu-time').textContent = new Date().toLocaleTimeString();
+        document.getElementById('imu-time').textContent = clockText();
+    }
+
+    // /sensor_stream pushes the same payload as /sensor_data whenever it changes. While the
+    // stream is open the 100 ms poll is a no-op; EventSource reconnects on its own and
+    // polling covers the gap (or an older server without the endpoint). When the /ws
+    // control socket is up it carries these frames instead and the stream is closed.
+    let _sensorStreamOpen = false, sensorStream = null;
+    function openSensorStream() {
+        if (!('EventSource' in window) || sensorStream) return;
+        sensorStream = new EventSource('/sensor_stream');
+        sensorStream.onopen    = () => { _sensorStreamOpen = true; };
+        sensorStream.onerror   = () => { _sensorStreamOpen = false; };
+        sensorStream.onmessage = e => { if (!_testActive) _queueLiveSensorData(JSON.parse(e.data)); };
+    }
+    function closeSensorStream() {
+        if (sensorStream) sensorStream.close();
+        sensorStream = null;
+        _sensorStreamOpen = false;
     }
+    openSensorStream();
 
     setInterval(updateLiveSensorData, 100);
     updateLiveSensorData();
@@ -2726,7 +3421,7 @@ def home():
             });
     }
     function startUltrasonic() {
-        fetch('/start_ultrasonic', { method: 'POST' })
+        fetch('/program/start/ultrasonic', { method: 'POST' })
             .then(r => r.json())
             .then(d => {
                 if (d.status === 'started') {
@@ -2738,7 +3433,7 @@ def home():
             });
     }
     function stopUltrasonic() {
-        fetch('/stop_ultrasonic', { method: 'POST' })
+        fetch('/program/stop/ultrasonic', { method: 'POST' })
             .then(() => {
                 setButtonPair('btn-ultrasonic-on', 'btn-ultrasonic-off', false);
                 logLine('ULTRASON', 'ultrasonic_bg.py stopped');
@@ -2821,7 +3516,7 @@ def home():
             .then(() => logLine("MOTOR", "Motor Test stopped"));
     }
     function startAutonav() {
-        fetch('/start_autonav', { method: 'POST' })
+        fetch('/program/start/autonav', { method: 'POST' })
             .then(r => r.json())
             .then(d => {
                 if (d.status === 'started') {
@@ -2833,7 +3528,7 @@ def home():
             });
     }
     function stopAutonav() {
-        fetch('/stop_autonav', { method: 'POST' })
+        fetch('/program/stop/autonav', { method: 'POST' })
             .then(() => {
                 setButtonPair('btn-tr-autonav-on', 'btn-tr-autonav-off', false);
                 logLine('AUTONAV', 'AutoNav stopped');
@@ -2949,18 +3644,36 @@ def home():
         if (e.key === 'ArrowLeft')  pdfPrev();
     });
 
-    function logLine(tag, text) {
-        const c = document.getElementById('console');
-        if (!c) return;
+    // Log lines are queued and appended once per frame; the console keeps the newest
+    // CONSOLE_MAX_LINES and only follows new output when already scrolled to the bottom.
+    const CONSOLE_MAX_LINES = 500;
+    const _logQ = [];
+
+    function _buildLogLine(e) {
         const div = document.createElement('div');
         div.className = 'line';
         const t = document.createElement('span');
-        t.className = 'tag'; t.textContent = tag;
+        t.className = 'tag'; t.textContent = e.tag;
         const span = document.createElement('span');
-        span.textContent = text;
+        span.textContent = e.text;
         div.appendChild(t); div.appendChild(span);
-        c.appendChild(div);
-        c.scrollTop = c.scrollHeight;
+        return div;
+    }
+
+    function _flushLogQ() {
+        const c = document.getElementById('console');
+        if (!c) { _logQ.length = 0; return; }
+        const wasAtBottom = c.scrollHeight - c.scrollTop - c.clientHeight < 4;
+        const frag = document.createDocumentFragment();
+        for (const e of _logQ) frag.appendChild(_buildLogLine(e));
+        _logQ.length = 0;
+        c.appendChild(frag);
+        while (c.childElementCount > CONSOLE_MAX_LINES) c.removeChild(c.firstChild);
+        if (wasAtBottom) c.scrollTop = c.scrollHeight;
+    }
+
+    function logLine(tag, text) {
+        if (_logQ.push({ tag, text }) === 1) requestAnimationFrame(_flushLogQ);
     }
 
     // =====================================================================
@@ -3059,12 +3772,14 @@ def home():
         pitchChart.data.datasets[1].data.push(PITCH_LIMIT_DEG);
         pitchChart.data.datasets[2].data.push(-PITCH_LIMIT_DEG);
 
-        // Drop points older than the window
-        while (pitchTimes.length > 0 && t - pitchTimes[0] > PITCH_WINDOW_S) {
-            pitchTimes.shift();
-            pitchValues.shift();
-            pitchChart.data.datasets[1].data.shift();
-            pitchChart.data.datasets[2].data.shift();
+        // Drop points older than the window — one splice per array, not a shift() per point
+        let drop = 0;
+        while (drop < pitchTimes.length && t - pitchTimes[drop] > PITCH_WINDOW_S) drop++;
+        if (drop > 0) {
+            pitchTimes.splice(0, drop);
+            pitchValues.splice(0, drop);
+            pitchChart.data.datasets[1].data.splice(0, drop);
+            pitchChart.data.datasets[2].data.splice(0, drop);
         }
 
         pitchChart.update('none');
@@ -3131,14 +3846,31 @@ def home():
         }
     });
 
-    // Rolling average buffers for spike suppression (5-sample ~= 500ms at 10Hz)
+    // Rolling average buffers for spike suppression (5-sample ~= 500ms at 10Hz).
+    // One Float32Array ring, row 0 = left wheel, row 1 = right wheel, shared head index.
+    // Running sums are updated as samples enter/leave, so the average is O(1).
     const RPM_SMOOTH = 5;
-    const _rpmLBuf = [], _rpmRBuf = [];
+    const _rpmRing = new Float32Array(2 * RPM_SMOOTH);
+    const _rpmSum  = new Float64Array(2);
+    let _rpmHead = 0, _rpmCount = 0;
+
+    function _ringPut(row, val) {
+        const i = row * RPM_SMOOTH + _rpmHead;
+        if (!Number.isFinite(val)) val = 0;   // a NaN would poison the running sum for good
+        if (_rpmCount === RPM_SMOOTH) _rpmSum[row] -= _rpmRing[i];   // evict oldest
+        _rpmRing[i] = val;
+        _rpmSum[row] += _rpmRing[i];   // add the stored float32, so eviction subtracts the same value
+    }
+
+    function _pushRpmRing(leftRpm, rightRpm) {
+        _ringPut(0, leftRpm);
+        _ringPut(1, rightRpm);
+        _rpmHead = (_rpmHead + 1) % RPM_SMOOTH;
+        if (_rpmCount < RPM_SMOOTH) _rpmCount++;
+    }
 
-    function _rollingAvg(buf, val) {
-        buf.push(val);
-        if (buf.length > RPM_SMOOTH) buf.shift();
-        return buf.reduce((a, b) => a + b, 0) / buf.length;
+    function _rpmRingAvg(row) {
+        return _rpmSum[row] / _rpmCount;
     }
 
     function pushRpmSample(leftRadS, rightRadS) {
@@ -3146,15 +3878,18 @@ def home():
         if (rpmT0 === null) rpmT0 = now;
         const t = now - rpmT0;
         const TO_RPM = 60 / (2 * Math.PI);
-        const leftRpm  = _rollingAvg(_rpmLBuf, leftRadS  * TO_RPM);
-        const rightRpm = _rollingAvg(_rpmRBuf, rightRadS * TO_RPM);
+        _pushRpmRing(leftRadS * TO_RPM, rightRadS * TO_RPM);
+        const leftRpm  = _rpmRingAvg(0);
+        const rightRpm = _rpmRingAvg(1);
         rpmTimes.push(t);
         rpmLeftVals.push(parseFloat(leftRpm.toFixed(1)));
         rpmRightVals.push(parseFloat(rightRpm.toFixed(1)));
-        while (rpmTimes.length > 0 && t - rpmTimes[0] > RPM_WINDOW_S) {
-            rpmTimes.shift();
-            rpmLeftVals.shift();
-            rpmRightVals.shift();
+        let drop = 0;
+        while (drop < rpmTimes.length && t - rpmTimes[drop] > RPM_WINDOW_S) drop++;
+        if (drop > 0) {
+            rpmTimes.splice(0, drop);
+            rpmLeftVals.splice(0, drop);
+            rpmRightVals.splice(0, drop);
         }
         rpmChart.update('none');
     }
@@ -3166,26 +3901,80 @@ def home():
     const knob = document.getElementById('joystick-knob');
     let joyCenter = { x: 60, y: 60 };
     let joyRadius = 44, joyActive = false, lastJoystickLog = 0;
+    let joyRect = null;   // area's client rect, taken on pointerdown so moves don't force layout
+    const joyXEl = document.getElementById('joy-x'), joyYEl = document.getElementById('joy-y');
     let joyLastX = 0, joyLastY = 0;
+    let joySentX = null, joySentY = null;   // last move sent, rounded to 0.1
     const joystickThrottleMs = 250;
 
-    function setKnob(x, y) { knob.style.left = x+'px'; knob.style.top = y+'px'; }
+    // Knob stays centred by CSS; drag offsets are applied as a compositor-only transform.
+    function setKnob(dx, dy) { knob.style.transform = 'translate3d(' + dx + 'px,' + dy + 'px,0)'; }
+
+    // Geometry is read once here and again only after a resize, never per pointermove.
+    function recomputeJoyGeometry() {
+        const w = area.offsetWidth, h = area.offsetHeight;   // border box, same origin as the rect
+        if (!w) return;   // hidden — keep the previous values
+        joyCenter = { x: w / 2, y: h / 2 };
+        joyRect = null;
+    }
+    recomputeJoyGeometry();
+    let joyResizePending = false;
+    window.addEventListener('resize', () => {
+        if (joyResizePending) return;
+        joyResizePending = true;
+        requestAnimationFrame(() => { joyResizePending = false; recomputeJoyGeometry(); });
+    }, {passive:true});
 
     function motorLog(msg) {
         const log = document.getElementById('joy-log');
         if (!log) return;
         const div = document.createElement('div');
-        const t = new Date().toLocaleTimeString('en-GB', { hour12: false });
+        const t = _gbTimeFmt.format(Date.now());
         div.textContent = t + '  ' + msg;
         div.style.cssText = 'border-bottom:1px solid #18303c;padding-bottom:3px;margin-bottom:3px;';
         log.insertBefore(div, log.firstChild);
         while (log.children.length > 200) log.removeChild(log.lastChild);
     }
 
+    // Joystick samples go over one WebSocket when the server has flask-sock installed;
+    // until it opens (or if /ws doesn't exist) they fall back to POST /direction_ajax.
+    // The same socket subscribes to the live sensor frames.
+    let ctrlWs = null;
+    function openCtrlSocket() {
+        if (!('WebSocket' in window)) return;
+        const ws = new WebSocket((location.protocol === 'https:' ? 'wss://' : 'ws://') + location.host + '/ws');
+        let opened = false;
+        // Sensor frames on the socket are deltas: the full payload first, then only the
+        // keys that changed. They are merged into one state object that the view reads.
+        let state = {};
+        ws.onopen  = () => {
+            opened = true; ctrlWs = ws;
+            ws.send(JSON.stringify({ type: 'sub', topic: 'sensor' }));
+            closeSensorStream();
+            _sensorStreamOpen = true;   // frames now arrive here; pause the poll
+        };
+        ws.onmessage = e => {
+            Object.assign(state, JSON.parse(e.data));
+            if (!_testActive) _queueLiveSensorData(state);
+        };
+        ws.onclose = () => {
+            ctrlWs = null;
+            if (!opened) return;
+            _sensorStreamOpen = false;
+            openSensorStream();
+            setTimeout(openCtrlSocket, 2000);
+        };
+    }
+    openCtrlSocket();
+
     function sendJoystick(x, y) {
         const now = Date.now();
         const shouldLog = now - lastJoystickLog > joystickThrottleMs;
         if (shouldLog) { lastJoystickLog = now; motorLog('joy  x:'+x.toFixed(2)+'  y:'+y.toFixed(2)); }
+        if (ctrlWs && ctrlWs.readyState === WebSocket.OPEN) {
+            ctrlWs.send(JSON.stringify({ type: 'joy', x, y, speed: getSpeed() }));
+            return;
+        }
         fetch('/direction_ajax', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
@@ -3194,35 +3983,85 @@ def home():
         }).catch(() => {});
     }
 
+    // Drag updates are throttled to one send per 50 ms, leading + trailing edge so the
+    // final position always goes out. Release calls sendJoystick directly.
+    const JOY_SEND_MIN_MS = 50;
+    let joyLastSendAt = 0, joySendTimer = null;
+
+    function sendJoystickThrottled(x, y) {
+        clearTimeout(joySendTimer);
+        const wait = JOY_SEND_MIN_MS - (performance.now() - joyLastSendAt);
+        if (wait <= 0) {
+            joyLastSendAt = performance.now();
+            sendJoystick(x, y);
+            return;
+        }
+        joySendTimer = setTimeout(() => {
+            if (!joyActive) return;
+            joyLastSendAt = performance.now();
+            sendJoystick(joyLastX, joyLastY);
+        }, wait);
+    }
+
     function updateJoystick(clientX, clientY) {
-        const rect = area.getBoundingClientRect();
+        const rect = joyRect || (joyRect = area.getBoundingClientRect());
         let dx = clientX - rect.left - joyCenter.x;
         let dy = clientY - rect.top  - joyCenter.y;
-        const dist = Math.sqrt(dx*dx + dy*dy);
-        if (dist > joyRadius) { const s = joyRadius/dist; dx*=s; dy*=s; }
-        setKnob(joyCenter.x + dx, joyCenter.y + dy);
+        // Compare squared distances; the sqrt is only needed to pull the knob back to the rim
+        const d2 = dx*dx + dy*dy;
+        if (d2 > joyRadius*joyRadius) { const s = joyRadius/Math.sqrt(d2); dx*=s; dy*=s; }
+        setKnob(dx, dy);
         const normX = Math.max(-1, Math.min(1, dx/joyRadius));
         const normY = Math.max(-1, Math.min(1,  -dy/joyRadius));
-        document.getElementById('joy-x').textContent = normX.toFixed(2);
-        document.getElementById('joy-y').textContent = normY.toFixed(2);
+        setText(joyXEl, normX.toFixed(2));
+        setText(joyYEl, normY.toFixed(2));
         joyLastX = normX; joyLastY = normY;
-        sendJoystick(normX, normY);
+        // Skip moves that don't change the value at 0.1 resolution — the 150 ms
+        // heartbeat keeps re-sending the held position, so nothing goes stale.
+        const rx = +normX.toFixed(1), ry = +normY.toFixed(1);
+        if (rx === joySentX && ry === joySentY) return;
+        joySentX = rx; joySentY = ry;
+        sendJoystickThrottled(normX, normY);
     }
 
     function resetJoystick() {
-        knob.style.left = '';
-        knob.style.top = '';
-        document.getElementById('joy-x').textContent = "0.00";
-        document.getElementById('joy-y').textContent = "0.00";
+        knob.style.transform = '';
+        setText(joyXEl, '0.00');
+        setText(joyYEl, '0.00');
+        joySentX = null; joySentY = null;
+        clearTimeout(joySendTimer);
         sendJoystick(0, 0);
     }
 
-    area.addEventListener('mousedown', e => { joyActive=true; updateJoystick(e.clientX, e.clientY); });
-    window.addEventListener('mousemove', e => { if (joyActive) updateJoystick(e.clientX, e.clientY); });
-    window.addEventListener('mouseup', () => { if (joyActive) { joyActive=false; resetJoystick(); } });
-    area.addEventListener('touchstart', e => { e.preventDefault(); joyActive=true; updateJoystick(e.touches[0].clientX, e.touches[0].clientY); }, {passive:false});
-    area.addEventListener('touchmove',  e => { e.preventDefault(); if (joyActive) updateJoystick(e.touches[0].clientX, e.touches[0].clientY); }, {passive:false});
-    area.addEventListener('touchend',   e => { e.preventDefault(); if (joyActive) { joyActive=false; resetJoystick(); } }, {passive:false});
+    // Pointer events cover mouse + touch; .joystick-area has touch-action:none, so the
+    // listeners can stay passive (no preventDefault needed to stop scrolling).
+    function joyRelease(e) {
+        if (!joyActive) return;
+        joyActive = false;
+        if (area.hasPointerCapture(e.pointerId)) area.releasePointerCapture(e.pointerId);
+        resetJoystick();
+    }
+    area.addEventListener('pointerdown', e => {
+        joyActive = true;
+        joyRect = area.getBoundingClientRect();   // page may have scrolled since the last drag
+        area.setPointerCapture(e.pointerId);
+        updateJoystick(e.clientX, e.clientY);
+    }, {passive:true});
+    // Moves are coalesced to one updateJoystick per frame, however fast the input device
+    // reports; pointerdown stays immediate.
+    let joyPendingX = 0, joyPendingY = 0, joyRafPending = false;
+    window.addEventListener('pointermove', e => {
+        if (!joyActive) return;
+        joyPendingX = e.clientX; joyPendingY = e.clientY;
+        if (joyRafPending) return;
+        joyRafPending = true;
+        requestAnimationFrame(() => {
+            joyRafPending = false;
+            if (joyActive) updateJoystick(joyPendingX, joyPendingY);
+        });
+    }, {passive:true});
+    window.addEventListener('pointerup',     joyRelease, {passive:true});
+    window.addEventListener('pointercancel', joyRelease, {passive:true});
 
     // =====================================================================
     // WASD MANUAL MOTOR CONTROL
@@ -3252,9 +4091,14 @@ def home():
 
     // Heartbeat: re-send active command every 150 ms so motor_wasd.py
     // never sees a stale timestamp (stale threshold = 300 ms)
+    // A joystick send from dragging in the last 50 ms already refreshed it — skip that beat
+    // (worst-case gap stays at 200 ms). Heartbeat sends count toward the drag throttle.
     setInterval(() => {
         if (wasdActive) sendMotorCmd(wasdActive);
-        if (joyActive)  sendJoystick(joyLastX, joyLastY);
+        if (joyActive && performance.now() - joyLastSendAt >= JOY_SEND_MIN_MS) {
+            joyLastSendAt = performance.now();
+            sendJoystick(joyLastX, joyLastY);
+        }
     }, 150);
 
     const dirLabel = { fwd: '▲ fwd', rev: '▼ rev', left: '◄ left', right: '► right' };
@@ -3301,7 +4145,7 @@ def home():
     }
 
     function _fmtTime(ts) {
-        return new Date(ts).toLocaleTimeString('en-GB', { hour12: false });
+        return _gbTimeFmt.format(ts);
     }
 
     function _rebuildHistory() {
@@ -3367,7 +4211,105 @@ def home():
 </body>
 </html>
 """
+# The CSS and JS are written inline above but served as separate files under
+# content-hashed names with a one-year immutable Cache-Control: a reload only revalidates
+# the HTML shell, and any edit to either block gets a new name.
+ASSET_CACHE_CONTROL = "public, max-age=31536000, immutable"
+_ASSETS = {}   # name -> (raw, gzip, brotli or None, mimetype)
+
+
+def _split_asset(html, open_tag, close_tag, ext, mimetype, ref):
+    """Cut the first open_tag...close_tag block out of html into _ASSETS; return the new html."""
+    start = html.index(open_tag)
+    end = html.index(close_tag, start)
+    raw = html[start + len(open_tag):end].encode("utf-8")
+    name = f"hub.{hashlib.md5(raw).hexdigest()[:8]}.{ext}"
+    br = brotli.compress(raw, quality=11) if brotli is not None else None
+    _ASSETS[name] = (raw, gzip.compress(raw, compresslevel=9), br, mimetype)
+    return html[:start] + ref.format(name) + html[end + len(close_tag):]
+
+
+_HOME_HTML = _split_asset(_HOME_HTML, "<style>", "</style>", "css", "text/css",
+                          '<link rel="stylesheet" href="/assets/{}">')
+_HOME_HTML = _split_asset(_HOME_HTML, "<script>", "</script>", "js", "text/javascript",
+                          '<script src="/assets/{}"></script>')
+
+
+@app.route("/assets/<name>")
+def serve_asset(name):
+    asset = _ASSETS.get(name)
+    if asset is None:
+        abort(404)
+    raw, gz, br, mimetype = asset
+    if br is not None and "br" in request.accept_encodings:
+        resp = Response(br, mimetype=mimetype)
+        resp.headers["Content-Encoding"] = "br"
+    elif "gzip" in request.accept_encodings:
+        resp = Response(gz, mimetype=mimetype)
+        resp.headers["Content-Encoding"] = "gzip"
+    else:
+        resp = Response(raw, mimetype=mimetype)
+    resp.headers["Vary"] = "Accept-Encoding"
+    resp.headers["Cache-Control"] = ASSET_CACHE_CONTROL
+    return resp
+
+
+# The page never changes at runtime: encode and compress it once at import.
+_HOME_HTML_BYTES = _HOME_HTML.encode("utf-8")
+_HOME_HTML_GZ    = gzip.compress(_HOME_HTML_BYTES, compresslevel=9)
+_HOME_HTML_BR    = brotli.compress(_HOME_HTML_BYTES, quality=11) if brotli is not None else None
+_HOME_HTML_ETAG  = hashlib.md5(_HOME_HTML_BYTES).hexdigest()
+
+
+@app.route("/")
+def home():
+    if _HOME_HTML_BR is not None and "br" in request.accept_encodings:
+        resp = Response(_HOME_HTML_BR, mimetype="text/html")
+        resp.headers["Content-Encoding"] = "br"
+        resp.set_etag(_HOME_HTML_ETAG + "-br")
+    elif "gzip" in request.accept_encodings:
+        resp = Response(_HOME_HTML_GZ, mimetype="text/html")
+        resp.headers["Content-Encoding"] = "gzip"
+        resp.set_etag(_HOME_HTML_ETAG + "-gz")
+    else:
+        resp = Response(_HOME_HTML_BYTES, mimetype="text/html")
+        resp.set_etag(_HOME_HTML_ETAG)
+    resp.headers["Vary"] = "Accept-Encoding"
+    resp.headers["Cache-Control"] = "no-cache"
+    resp = resp.make_conditional(request)
+    if resp.status_code == 200:   # revalidations (304) aren't new page loads
+        log_to_file("SYSTEM", "Web interface loaded")
+    return resp
+
+
+# ASGI entry point for uvicorn (`uvicorn Webserver:asgi_app`). a2wsgi runs WSGI calls on
+# its own pool of 8 threads, so an open /sensor_stream holds one thread, not the server.
+# (asgiref's WsgiToAsgi is not usable here: it runs every call on one shared thread, so
+# the first stream would block every other request, stop buttons included.) The
+# flask-sock /ws channel needs a WSGI server; under uvicorn the page falls back to SSE
+# and POST /direction_ajax on its own.
+try:
+    from a2wsgi import WSGIMiddleware
+    asgi_app = WSGIMiddleware(app, workers=8)
+except ImportError:
+    asgi_app = None
 
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=8080, debug=False)
+    # On the robot, prefer gunicorn — `gunicorn Webserver:app` picks up gunicorn.conf.py.
+    # Keep a single worker — PROGRAM_PROCS lives in this process, so a second worker
+    # would not see (or be able to stop) programs started by the first.
+    try:
+        from waitress import serve
+    except ImportError:
+        serve = None
+    if os.environ.get("DEV"):
+        # Reloader + debugger for working on the page; never leave this on on the robot
+        app.run(host="0.0.0.0", port=8080, debug=True, threaded=True)
+    elif serve is not None:
+        # One process, a thread pool, so a slow start/stop never stalls the pollers
+        serve(app, host="0.0.0.0", port=8080, threads=8)
+    else:
+        from werkzeug.serving import WSGIRequestHandler
+        WSGIRequestHandler.protocol_version = "HTTP/1.1"   # keep-alive for the 10 Hz pollers
+        app.run(host="0.0.0.0", port=8080, debug=False, threaded=True)
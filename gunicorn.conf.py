@@ -0,0 +1,20 @@
+# gunicorn reads this file from the working directory, so on the robot
+#   gunicorn Webserver:app
+# is all that's needed. Keep a single worker: PROGRAM_PROCS lives in the web process,
+# so a second worker would not see (or be able to stop) programs started by the first.
+import os
+
+bind         = "0.0.0.0:8080"
+workers      = 1
+keepalive    = 5      # the dashboard polls every 100 ms; reuse the connection
+accesslog    = None   # per-request access lines cost more than they're worth here
+
+# Every open dashboard tab holds one /ws or /sensor_stream connection, and under gthread
+# each of those pins one of the threads. GUNICORN_GEVENT=1 (needs `pip install gevent`)
+# serves them as greenlets instead, so many tabs don't starve the control requests.
+if os.environ.get("GUNICORN_GEVENT"):
+    worker_class       = "gevent"
+    worker_connections = 1000
+else:
+    worker_class = "gthread"
+    threads      = 8